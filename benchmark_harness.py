@@ -0,0 +1,287 @@
+import gc
+import hashlib
+import inspect
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Banc d'essai réutilisable : échauffement, nombre de répétitions adaptatif
+# jusqu'à atteindre l'intervalle de confiance visé, contrôle du ramasse-miettes
+# et mesure de la mémoire avec tracemalloc
+
+Z_95 = 1.96  # Quantile de la loi normale pour un intervalle de confiance à 95 %
+
+def _time_sample(func, args, number):
+    """Chronomètre `number` appels consécutifs et retourne le temps moyen par appel"""
+    start_time = time.perf_counter()
+    for _ in range(number):
+        func(*args)
+    return (time.perf_counter() - start_time) / number
+
+def _calibrate(func, args, min_sample_time):
+    """
+    Choisit le nombre d'appels par échantillon (comme timeit.autorange) pour que
+    chaque échantillon dure au moins min_sample_time et ne soit pas dominé par le bruit
+    """
+    number = 1
+    while True:
+        per_call = _time_sample(func, args, number)
+        if per_call * number >= min_sample_time:
+            return number, per_call
+        number *= 10
+
+def measure_peak_memory(func, *args):
+    """Mesure le pic de mémoire allouée (en octets) pendant un appel avec tracemalloc"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        func(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def summarize(samples):
+    """Calcule médiane, quartiles, IQR, minimum et intervalle de confiance d'une série de temps"""
+    median = statistics.median(samples)
+    if len(samples) >= 2:
+        q1, _, q3 = statistics.quantiles(samples, n=4, method='inclusive')
+        stdev = statistics.stdev(samples)
+    else:
+        q1 = q3 = median
+        stdev = 0.0
+    return {
+        'mediane': median,
+        'q1': q1,
+        'q3': q3,
+        'iqr': q3 - q1,
+        'min': min(samples),
+        'max': max(samples),
+        'moyenne': statistics.fmean(samples),
+        'ecart_type': stdev,
+        'ic95': Z_95 * stdev / len(samples) ** 0.5,
+        'repetitions': len(samples),
+    }
+
+def run_benchmark(func, *args, warmup=2, min_repeats=5, max_repeats=200, target_ci=0.05,
+                  max_time=10.0, min_sample_time=1e-3, disable_gc=True, measure_memory=True):
+    """
+    Mesure le temps d'exécution de func(*args) de manière statistiquement fiable
+
+    - warmup appels d'échauffement non mesurés (caches, allocations, imports paresseux)
+    - répétitions jusqu'à ce que la demi-largeur de l'IC à 95 % soit inférieure à
+      target_ci x médiane, entre min_repeats et max_repeats échantillons
+    - max_time (secondes) borne la durée totale, quitte à faire moins de min_repeats
+      échantillons ; un appel plus long que max_time est mesuré une seule fois
+    - le ramasse-miettes est désactivé pendant les mesures si disable_gc est vrai
+
+    Retourne un dictionnaire (voir summarize) complété par le nombre d'appels par
+    échantillon et le pic mémoire en octets (None si non mesuré).
+    """
+    gc_was_enabled = gc.isenabled()
+    start_time = time.perf_counter()
+    try:
+        gc.collect()
+        if disable_gc:
+            gc.disable()
+
+        # Le premier appel sert aussi à détecter les fonctions trop lentes pour être répétées
+        first_time = _time_sample(func, args, 1)
+        if first_time >= max_time:
+            samples, number = [first_time], 1
+        else:
+            for _ in range(max(0, warmup - 1)):
+                if time.perf_counter() - start_time >= max_time:
+                    break
+                func(*args)
+            number, first_sample = _calibrate(func, args, min_sample_time)
+            samples = [first_sample]
+            while len(samples) < max_repeats:
+                if time.perf_counter() - start_time >= max_time:
+                    break
+                if len(samples) >= min_repeats:
+                    stats = summarize(samples)
+                    if stats['ic95'] <= target_ci * stats['mediane']:
+                        break
+                gc.collect()
+                samples.append(_time_sample(func, args, number))
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    result = summarize(samples)
+    result['appels_par_echantillon'] = number
+    # La mesure mémoire refait un appel complet : on l'évite pour les fonctions trop lentes
+    if measure_memory and result['mediane'] < max_time:
+        result['memoire_pic_octets'] = measure_peak_memory(func, *args)
+    else:
+        result['memoire_pic_octets'] = None
+    return result
+
+def environment_metadata():
+    """Décrit la machine et les versions utilisées pour les mesures"""
+    return {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'plateforme': platform.platform(),
+        'processeur': platform.processor() or platform.machine(),
+        'nombre_coeurs': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+
+def save_results_json(records, file_path, metadata=None):
+    """Sauvegarde les mesures et les métadonnées d'environnement dans un fichier JSON"""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        json.dump({'environnement': metadata or environment_metadata(), 'mesures': records},
+                  f, indent=2, ensure_ascii=False)
+
+def save_results_csv(records, file_path):
+    """Sauvegarde les mesures (une ligne par mesure) dans un fichier CSV"""
+    pd.DataFrame(records).to_csv(file_path, index=False)
+
+# Stockage incrémental des résultats : un fichier JSONL en ajout seul, dont chaque
+# ligne est une mesure identifiée par sa clé (voir store_key)
+
+STORE_KEY_FIELDS = ('algorithme', 'taille_donnees', 'repetition', 'hash_fichier', 'version_code')
+
+def file_hash(file_path, chunk_size=1 << 20):
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def code_version(func):
+    """
+    Empreinte du code source d'une fonction et des fonctions du même module qu'elle
+    appelle (récursivement) : elle change dès que l'algorithme mesuré est modifié
+    """
+    module = inspect.getmodule(func)
+    seen = {}
+    pending = [func]
+    while pending:
+        current = pending.pop()
+        if current.__name__ in seen:
+            continue
+        seen[current.__name__] = inspect.getsource(current)
+        codes = [current.__code__]
+        while codes:
+            code = codes.pop()
+            codes.extend(c for c in code.co_consts if inspect.iscode(c))
+            for name in code.co_names:
+                candidate = getattr(module, name, None)
+                if inspect.isfunction(candidate) and inspect.getmodule(candidate) is module:
+                    pending.append(candidate)
+    digest = hashlib.sha256()
+    for name in sorted(seen):
+        digest.update(seen[name].encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def store_key(record):
+    """Clé d'une mesure dans le stockage"""
+    return tuple(record[field] for field in STORE_KEY_FIELDS)
+
+def load_store(file_path):
+    """
+    Relit le stockage et retourne {clé: mesure} (la dernière mesure d'une clé l'emporte)
+    Une dernière ligne tronquée par un arrêt brutal est ignorée
+    """
+    store = {}
+    if not os.path.exists(file_path):
+        return store
+    with open(file_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            store[store_key(record)] = record
+    return store
+
+def append_to_store(file_path, record):
+    """Ajoute une mesure à la fin du stockage et force l'écriture sur disque"""
+    with open(file_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+# Analyse de complexité : ajustement temps = constante x n^exposant et détection de régressions
+
+# Quantiles 0,975 de la loi de Student (1 à 30 degrés de liberté), au-delà on utilise Z_95
+T_975 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+         2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+         2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+def fit_scaling(sizes, times):
+    """
+    Ajuste temps = constante x n^exposant par moindres carrés sur (log n, log temps)
+    Retourne l'exposant et la constante avec leurs intervalles de confiance à 95 %,
+    ainsi que le R² ; None s'il y a moins de 3 points
+    """
+    x = np.log(np.asarray(sizes, dtype=float))
+    y = np.log(np.asarray(times, dtype=float))
+    n = len(x)
+    if n < 3:
+        return None
+    slope, intercept = np.polyfit(x, y, 1)
+    residuals = y - (slope * x + intercept)
+    dof = n - 2
+    s2 = float(residuals @ residuals) / dof
+    sxx = float(((x - x.mean()) ** 2).sum())
+    se_slope = (s2 / sxx) ** 0.5
+    se_intercept = (s2 * (1 / n + x.mean() ** 2 / sxx)) ** 0.5
+    t = T_975[dof - 1] if dof <= len(T_975) else Z_95
+    ss_tot = float(((y - y.mean()) ** 2).sum())
+    return {
+        'exposant': float(slope),
+        'exposant_ic95': [float(slope - t * se_slope), float(slope + t * se_slope)],
+        'constante': float(np.exp(intercept)),
+        'constante_ic95': [float(np.exp(intercept - t * se_intercept)), float(np.exp(intercept + t * se_intercept))],
+        'r2': 1 - float(residuals @ residuals) / ss_tot if ss_tot > 0 else 1.0,
+        'points': n,
+        'tailles': [int(v) for v in sizes],
+    }
+
+def detect_regressions(fits, baseline_fits, exponent_threshold=0.1, constant_threshold=0.25):
+    """
+    Compare des ajustements à ceux d'une exécution de référence
+    Régression si l'exposant augmente de plus de exponent_threshold, ou si le coût augmente
+    de plus de constant_threshold (en proportion) : rapport des constantes quand les
+    exposants sont comparables (écart d'au plus exponent_threshold), sinon rapport des temps
+    prédits à la plus grande taille mesurée (les constantes de deux exposants différents
+    n'ont pas la même unité)
+    """
+    regressions = []
+    for name, fit in fits.items():
+        baseline = baseline_fits.get(name)
+        if fit is None or baseline is None:
+            continue
+        exponent_delta = fit['exposant'] - baseline['exposant']
+        constant_ratio = fit['constante'] / baseline['constante']
+        reasons = []
+        if exponent_delta > exponent_threshold:
+            reasons.append(f"exposant {baseline['exposant']:.3f} -> {fit['exposant']:.3f}")
+        elif abs(exponent_delta) <= exponent_threshold:
+            if constant_ratio > 1 + constant_threshold:
+                reasons.append(f"constante x{constant_ratio:.2f}")
+        else:
+            # Exposant en baisse : le gain ne compte que s'il se traduit en temps aux tailles mesurées
+            reference_n = max(fit.get('tailles') or baseline.get('tailles') or [1])
+            time_ratio = constant_ratio * reference_n ** exponent_delta
+            if time_ratio > 1 + constant_threshold:
+                reasons.append(f"temps prédit x{time_ratio:.2f} à n={reference_n}")
+        if reasons:
+            regressions.append({'algorithme': name, 'ecart_exposant': exponent_delta,
+                                'rapport_constante': constant_ratio, 'raisons': reasons})
+    return regressions
@@ -2,18 +2,170 @@
 # Démo Cryptographie : César + RSA
 # Rayan 2025
 
+import argparse
+import functools
+import json
+import multiprocessing
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
 # --- Fonction César ---
+def _cesar_char(char, shift):
+    # Règle de décalage d'un caractère : lettres modulo 26, chiffres modulo 10
+    if char.isalpha():
+        base = ord('A') if char.isupper() else ord('a')
+        return chr((ord(char) - base - shift) % 26 + base)
+    elif char.isdigit():
+        return str((int(char) - shift) % 10)
+    return char
+
+class _TableCesar(dict):
+    # Table pour str.translate, remplie à la demande avec _cesar_char :
+    # chaque caractère distinct n'est calculé qu'une fois, le reste se fait en C
+    def __init__(self, shift):
+        super().__init__()
+        self.shift = shift
+
+    def __missing__(self, code):
+        self[code] = _cesar_char(chr(code), self.shift)
+        return self[code]
+
+@functools.lru_cache(maxsize=None)
+def _table_cesar(shift):
+    return _TableCesar(shift)
+
+def cesar_table(shift=4):
+    # Décaler de shift ou de shift + 130 (ppcm de 26 et 10) donne le même résultat
+    return _table_cesar(shift % 130)
+
 def cesar_decrypt(text, shift=4):
-    result = ""
-    for char in text:
-        if char.isalpha():
-            base = ord('A') if char.isupper() else ord('a')
-            result += chr((ord(char) - base - shift) % 26 + base)
-        elif char.isdigit():
-            result += str((int(char) - shift) % 10)
-        else:
-            result += char
-    return result
+    return text.translate(cesar_table(shift))
+
+# --- César en masse ---
+def cesar_decrypt_many(messages, shift=4):
+    # Déchiffre une liste de messages avec la même table de traduction
+    table = cesar_table(shift)
+    return [message.translate(table) for message in messages]
+
+def cesar_decrypt_file(input_path, output_path, shift=4, chunk_size=1 << 20, encoding='utf-8'):
+    # Déchiffre un fichier par blocs de chunk_size caractères (mémoire constante)
+    # newline='' conserve les fins de ligne telles quelles
+    table = cesar_table(shift)
+    total = 0
+    with open(input_path, encoding=encoding, newline='') as src, \
+         open(output_path, 'w', encoding=encoding, newline='') as dst:
+        while True:
+            chunk = src.read(chunk_size)
+            if not chunk:
+                break
+            dst.write(chunk.translate(table))
+            total += len(chunk)
+    return total
+
+# --- Cassage de César par analyse de fréquences ---
+# Fréquences des lettres a..z (en %) en français et en anglais
+LETTER_FREQ = {
+    'fr': [7.64, 0.90, 3.26, 3.67, 14.72, 1.07, 0.87, 0.74, 7.53, 0.61, 0.05, 5.46, 2.97,
+           7.10, 5.80, 2.52, 1.36, 6.69, 7.95, 7.24, 6.31, 1.84, 0.05, 0.43, 0.13, 0.33],
+    'en': [8.17, 1.49, 2.78, 4.25, 12.70, 2.23, 2.02, 6.09, 6.97, 0.15, 0.77, 4.03, 2.41,
+           6.75, 7.51, 1.93, 0.10, 5.99, 6.33, 9.06, 2.76, 0.98, 2.36, 0.15, 1.97, 0.07],
+}
+# Premier chiffre des nombres : loi de Benford (un 0 en tête est très rare)
+LEADING_DIGIT_FREQ = [0.1] + [100 * np.log10(1 + 1 / k) for k in range(1, 10)]
+
+# _SHIFTED_26[k, i] = lettre chiffrée qui donne la lettre i avec le décalage k
+_SHIFTED_26 = (np.arange(26)[None, :] + np.arange(26)[:, None]) % 26
+_SHIFTED_10 = (np.arange(10)[None, :] + np.arange(10)[:, None]) % 10
+
+def _count_symbols(messages):
+    # Compte en une passe vectorisée les lettres ASCII (m x 26) et les premiers chiffres
+    # des nombres (m x 10) de chaque message
+    m = len(messages)
+    lengths = [len(message) for message in messages]
+    # Un caractère non ASCII devient un seul '?' : les positions restent alignées
+    codes = np.frombuffer("".join(messages).encode('ascii', 'replace'), dtype=np.uint8)
+    ids = np.repeat(np.arange(m), lengths)
+    lower = codes | 0x20
+    is_letter = (lower >= ord('a')) & (lower <= ord('z'))
+    letters = np.bincount(ids[is_letter] * 26 + (lower[is_letter] - ord('a')),
+                          minlength=m * 26).reshape(m, 26)
+    is_digit = (codes >= ord('0')) & (codes <= ord('9'))
+    follows_digit = np.zeros_like(is_digit)
+    follows_digit[1:] = is_digit[:-1] & (ids[1:] == ids[:-1])
+    leading = is_digit & ~follows_digit
+    digits = np.bincount(ids[leading] * 10 + (codes[leading] - ord('0')),
+                         minlength=m * 10).reshape(m, 10)
+    return letters, digits
+
+def _chi2_all_shifts(counts, freq, shifted):
+    # Khi-deux de chaque message (lignes) pour chaque décalage (colonnes), en un produit
+    # matriciel : somme (o - e)² / e = somme o² / e - N, avec e = N x fréquence
+    freq = np.asarray(freq, dtype=float)
+    freq = freq / freq.sum()
+    # weights[j, k] = 1 / fréquence de la lettre claire que donne la lettre chiffrée j avec le décalage k
+    weights = np.zeros((len(freq), len(freq)))
+    weights[shifted, np.arange(len(freq))[:, None]] = 1 / freq[None, :]
+    total = counts.sum(axis=1, keepdims=True).astype(float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        chi2 = (counts.astype(float) ** 2 @ weights) / total - total
+    return np.nan_to_num(chi2)
+
+def _confidence(scores, best):
+    # 1 - meilleur score / deuxième meilleur : proche de 1 quand la clé se détache nettement
+    others = np.where(np.arange(scores.shape[1])[None, :] == best[:, None], np.inf, scores)
+    second = others.min(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        confidence = np.where(second > 0, 1 - scores[np.arange(len(best)), best] / second, 0.0)
+    return np.clip(np.nan_to_num(confidence), 0.0, 1.0)
+
+def cesar_crack_many(messages, lang='auto'):
+    # Retrouve la clé de chaque message : décalage des lettres par khi-deux contre le
+    # modèle de langue ('fr', 'en' ou 'auto' = le meilleur des deux), décalage des chiffres
+    # par khi-deux des premiers chiffres contre la loi de Benford.
+    # La clé retournée (0 à 129) s'utilise directement avec cesar_decrypt.
+    if not messages:
+        return []
+    letters, digits = _count_symbols(messages)
+    languages = list(LETTER_FREQ) if lang == 'auto' else [lang]
+    chi2_by_lang = np.stack([_chi2_all_shifts(letters, LETTER_FREQ[name], _SHIFTED_26) for name in languages])
+    best_lang = chi2_by_lang.min(axis=2).argmin(axis=0)
+    chi2_letters = chi2_by_lang[best_lang, np.arange(len(messages))]
+    chi2_digits = _chi2_all_shifts(digits, LEADING_DIGIT_FREQ, _SHIFTED_10)
+
+    # Une clé s agit en s mod 26 sur les lettres et s mod 10 sur les chiffres : on
+    # combine les deux scores sur les 130 clés, le plus petit s gagne en cas d'égalité
+    keys = np.arange(130)
+    scores = chi2_letters[:, keys % 26] + chi2_digits[:, keys % 10]
+    best = scores.argmin(axis=1)
+    has_letters = letters.sum(axis=1) > 0
+    confidence = np.where(has_letters,
+                          _confidence(chi2_letters, best % 26),
+                          _confidence(chi2_digits, best % 10))
+    return [{'cle': int(key), 'confiance': float(conf),
+             'langue': languages[lang_index] if has else None,
+             'texte': cesar_decrypt(message, int(key))}
+            for message, key, conf, lang_index, has
+            in zip(messages, best, confidence, best_lang, has_letters)]
+
+def cesar_crack(message, lang='auto'):
+    return cesar_crack_many([message], lang)[0]
+
+def cesar_crack_file(input_path, lang='auto', batch_size=10000, encoding='utf-8'):
+    # Casse un fichier de messages (un par ligne) en une passe, par lots de batch_size :
+    # la mémoire ne dépend que de la taille des lots
+    with open(input_path, encoding=encoding) as f:
+        batch = []
+        for line in f:
+            batch.append(line.rstrip('\r\n'))
+            if len(batch) >= batch_size:
+                yield from cesar_crack_many(batch, lang)
+                batch = []
+        if batch:
+            yield from cesar_crack_many(batch, lang)
 
 # --- Fonction RSA ---
 def rsa_decrypt(cipher_list, d, n):
@@ -23,12 +175,314 @@ def rsa_decrypt(cipher_list, d, n):
         decrypted += chr(m)
     return decrypted
 
+# --- RSA avec le théorème des restes chinois (CRT) ---
+def rsa_private_key(p, q, d):
+    # Clé privée au format CRT : deux exponentiations modulo p et q (moitié de la taille de n)
+    # au lieu d'une modulo n, soit environ 4 fois moins de calcul
+    return {'n': p * q, 'd': d, 'p': p, 'q': q,
+            'dP': d % (p - 1), 'dQ': d % (q - 1), 'qInv': pow(q, -1, p)}
 
-if __name__ == "__main__":
+def rsa_decrypt_int_crt(c, key):
+    # Recombinaison de Garner : m = m2 + q * (qInv * (m1 - m2) mod p)
+    m1 = pow(c, key['dP'], key['p'])
+    m2 = pow(c, key['dQ'], key['q'])
+    h = (key['qInv'] * (m1 - m2)) % key['p']
+    return m2 + h * key['q']
+
+def _rsa_decrypt_chunk_crt(chunk, key):
+    # Exécuté dans les processus du pool
+    return [rsa_decrypt_int_crt(c, key) for c in chunk]
+
+def rsa_decrypt_ints_crt(cipher_list, key, workers=None, cache=None, min_parallel=2000):
+    # Déchiffre une liste d'entiers et retourne la liste des entiers clairs.
+    # Chaque bloc chiffré distinct n'est déchiffré qu'une fois : en RSA caractère par
+    # caractère les mêmes valeurs reviennent sans cesse. cache (dict) peut être
+    # réutilisé d'un appel à l'autre avec la même clé.
+    # Au-delà de min_parallel blocs distincts, le calcul est réparti sur `workers` processus.
+    cache = {} if cache is None else cache
+    missing = [c for c in dict.fromkeys(cipher_list) if c not in cache]
+    if workers and workers > 1 and len(missing) >= min_parallel:
+        chunk_size = -(-len(missing) // (workers * 4))
+        chunks = [missing[i:i + chunk_size] for i in range(0, len(missing), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for chunk, values in zip(chunks, executor.map(_rsa_decrypt_chunk_crt, chunks,
+                                                          [key] * len(chunks))):
+                cache.update(zip(chunk, values))
+    else:
+        for c in missing:
+            cache[c] = rsa_decrypt_int_crt(c, key)
+    return [cache[c] for c in cipher_list]
+
+def rsa_decrypt_crt(cipher_list, key, workers=None, cache=None, min_parallel=2000):
+    # Équivalent de rsa_decrypt(cipher_list, d, n) avec une clé au format CRT
+    return "".join(map(chr, rsa_decrypt_ints_crt(cipher_list, key, workers, cache, min_parallel)))
+
+# --- RSA par blocs (plusieurs octets par exponentiation) ---
+# rsa_decrypt chiffre un caractère par entier : un pow par caractère. Ici le message
+# UTF-8 est découpé en blocs d'autant d'octets que possible sous n, soit environ
+# log2(n)/8 fois moins d'exponentiations. Format du flux avant découpage :
+#   version (1 octet) | longueur du message en octets (4 octets) | message | bourrage
+# Le bourrage (octets nuls) complète le dernier bloc ; la longueur permet de le retirer.
+# Ce n'est pas un bourrage cryptographique (OAEP) : chiffrement d'exercice uniquement.
+RSA_PACKED_VERSION = 1
+_RSA_HEADER_SIZE = 5
+
+def rsa_block_size(n):
+    # Nombre d'octets par bloc : le plus grand k tel que 256^k <= n
+    return (n.bit_length() - 1) // 8
+
+def rsa_pack(message, n):
+    # Message -> liste d'entiers clairs, chacun strictement inférieur à n
+    k = rsa_block_size(n)
+    if k < 1:
+        raise ValueError("Module RSA trop petit pour chiffrer par blocs (n doit être >= 256)")
+    data = message.encode('utf-8')
+    framed = bytes([RSA_PACKED_VERSION]) + len(data).to_bytes(4, 'big') + data
+    framed += bytes(-len(framed) % k)
+    return [int.from_bytes(framed[i:i + k], 'big') for i in range(0, len(framed), k)]
+
+def rsa_unpack(blocks, n):
+    # Inverse de rsa_pack : liste d'entiers clairs -> message
+    k = rsa_block_size(n)
+    limit = 1 << (8 * k)
+    if any(not 0 <= m < limit for m in blocks):
+        # Mauvaise clé ou données corrompues : un bloc clair ne tient pas sur k octets
+        raise ValueError("bloc RSA invalide")
+    framed = b"".join(m.to_bytes(k, 'big') for m in blocks)
+    if len(framed) < _RSA_HEADER_SIZE or framed[0] != RSA_PACKED_VERSION:
+        raise ValueError("Message RSA par blocs invalide (en-tête absent ou version inconnue)")
+    length = int.from_bytes(framed[1:_RSA_HEADER_SIZE], 'big')
+    if _RSA_HEADER_SIZE + length > len(framed):
+        raise ValueError("Message RSA par blocs tronqué")
+    return framed[_RSA_HEADER_SIZE:_RSA_HEADER_SIZE + length].decode('utf-8')
+
+def rsa_encrypt_packed(message, e, n):
+    return [pow(m, e, n) for m in rsa_pack(message, n)]
+
+def rsa_decrypt_packed(cipher_list, d, n):
+    return rsa_unpack([pow(c, d, n) for c in cipher_list], n)
+
+def rsa_decrypt_packed_crt(cipher_list, key, workers=None, cache=None, min_parallel=2000):
+    return rsa_unpack(rsa_decrypt_ints_crt(cipher_list, key, workers, cache, min_parallel), key['n'])
+
+def _is_packed(first_block, n):
+    # Le premier bloc d'un message par blocs commence par l'octet de version : dès que
+    # les blocs font au moins 4 octets il dépasse le plus grand caractère Unicode (0x10FFFF),
+    # ce qui le distingue sans ambiguïté de l'ancien format caractère par caractère.
+    # En dessous (n < 2^32), on considère que c'est l'ancien format.
+    k = rsa_block_size(n)
+    return k >= 4 and first_block >> (8 * (k - 1)) == RSA_PACKED_VERSION
+
+def rsa_decrypt_auto(cipher_list, d, n, key=None, cache=None):
+    # Déchiffre indifféremment l'ancien format (un caractère par entier) ou le format par blocs ;
+    # avec une clé CRT (key), les exponentiations passent par rsa_decrypt_ints_crt
+    if key is not None:
+        blocks = rsa_decrypt_ints_crt(cipher_list, key, cache=cache)
+    else:
+        blocks = [pow(c, d, n) for c in cipher_list]
+    if blocks and _is_packed(blocks[0], n):
+        return rsa_unpack(blocks, n)
+    return "".join(map(chr, blocks))
+
+# --- Génération de clés pour le benchmark ---
+def _is_probable_prime(n, rounds=32):
+    # Test de Miller-Rabin
+    if n < 2:
+        return False
+    for small in (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37):
+        if n % small == 0:
+            return n == small
+    r, s = n - 1, 0
+    while r % 2 == 0:
+        r //= 2
+        s += 1
+    for _ in range(rounds):
+        x = pow(random.randrange(2, n - 1), r, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def _random_prime(bits):
+    while True:
+        candidate = random.getrandbits(bits) | (1 << (bits - 1)) | 1
+        if _is_probable_prime(candidate):
+            return candidate
+
+def generate_rsa_key(bits=2048, e=65537):
+    # Clé RSA de test (ne pas utiliser en production : random n'est pas cryptographique)
+    while True:
+        p, q = _random_prime(bits // 2), _random_prime(bits // 2)
+        phi = (p - 1) * (q - 1)
+        if p != q and phi % e != 0:
+            key = rsa_private_key(p, q, pow(e, -1, phi))
+            key['e'] = e
+            return key
+
+def benchmark_rsa(bits=2048, length=1000, workers=4):
+    # Compare rsa_decrypt (pow modulo n) au déchiffrement CRT, avec et sans pool de processus
+    key = generate_rsa_key(bits)
+    message = "".join(random.choice("abcdefghijklmnopqrstuvwxyz ") for _ in range(length))
+    cipher_list = [pow(ord(char), key['e'], key['n']) for char in message]
+    print(f"Clé de {bits} bits, message de {length} caractères "
+          f"({len(set(cipher_list))} blocs distincts)")
+
+    start = time.perf_counter()
+    assert rsa_decrypt(cipher_list, key['d'], key['n']) == message
+    reference = time.perf_counter() - start
+    print(f"rsa_decrypt (pow modulo n)      : {reference:.4f} s")
+
+    start = time.perf_counter()
+    assert rsa_decrypt_crt(cipher_list, key) == message
+    crt_time = time.perf_counter() - start
+    print(f"rsa_decrypt_crt (CRT + cache)   : {crt_time:.4f} s (x{reference / crt_time:.1f})")
+
+    start = time.perf_counter()
+    packed = rsa_encrypt_packed(message, key['e'], key['n'])
+    assert rsa_decrypt_packed_crt(packed, key) == message
+    packed_time = time.perf_counter() - start
+    print(f"Par blocs ({len(packed)} blocs de {rsa_block_size(key['n'])} octets, chiffrement "
+          f"+ déchiffrement CRT) : {packed_time:.4f} s (x{reference / packed_time:.1f})")
+
+    # Sans répétitions : chaque bloc est distinct, on mesure le gain du CRT seul puis du pool
+    distinct = [random.randrange(2, key['n']) for _ in range(length)]
+    start = time.perf_counter()
+    expected = [pow(c, key['d'], key['n']) for c in distinct]
+    full_pow = time.perf_counter() - start
+    start = time.perf_counter()
+    assert rsa_decrypt_ints_crt(distinct, key) == expected
+    sequential = time.perf_counter() - start
+    print(f"{length} blocs distincts, pow modulo n : {full_pow:.4f} s")
+    print(f"{length} blocs distincts, CRT          : {sequential:.4f} s (x{full_pow / sequential:.1f})")
+    if workers > 1:
+        start = time.perf_counter()
+        assert rsa_decrypt_ints_crt(distinct, key, workers=workers, min_parallel=0) == expected
+        parallel = time.perf_counter() - start
+        print(f"{length} blocs distincts, CRT {workers} processus : {parallel:.4f} s (x{full_pow / parallel:.1f})")
+
+
+# --- Mode lot (ligne de commande) ---
+# Cache des blocs RSA déjà déchiffrés, propre à chaque processus
+_rsa_cache = {}
+
+def _parse_line(line, mode, fmt):
+    # Une ligne d'entrée : texte brut / entiers séparés par des virgules, ou objet JSON {"message": ...}
+    if fmt == 'jsonl':
+        return json.loads(line)['message']
+    if mode == 'rsa':
+        return [int(x.strip()) for x in line.split(",")]
+    return line
+
+def _process_batch(lines, mode, fmt, params):
+    # Traite un lot de lignes et retourne les lignes de sortie (exécuté dans un processus du pool)
+    messages = [_parse_line(line, mode, fmt) for line in lines]
+    if mode == 'cesar':
+        results = [{'texte': texte} for texte in cesar_decrypt_many(messages, params['shift'])]
+    elif mode == 'cassage':
+        results = cesar_crack_many(messages, params['lang'])
+    else:
+        key = None
+        if params.get('p') and params.get('q'):
+            key = rsa_private_key(params['p'], params['q'], params['d'])
+        results = [{'texte': rsa_decrypt_auto(message, params['d'], params['n'], key, _rsa_cache)}
+                   for message in messages]
+
+    if fmt == 'jsonl':
+        return [json.dumps({'message': message, **result}, ensure_ascii=False)
+                for message, result in zip(messages, results)]
+    if mode == 'cassage':
+        return [f"{result['cle']}\t{result['confiance']:.3f}\t{result['texte']}" for result in results]
+    return [result['texte'] for result in results]
+
+def _batches(lines, batch_size, skip_blank=False):
+    # Avec skip_blank, les lignes vides (ou d'espaces) sont ignorées : en mode rsa ou jsonl
+    # elles ne contiennent aucun message (ex. ligne vide en fin de fichier)
+    batch = []
+    for line in lines:
+        line = line.rstrip('\r\n')
+        if skip_blank and not line.strip():
+            continue
+        batch.append(line)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def run_batch(args):
+    # Lit les messages en flux (fichier ou entrée standard), les traite par lots,
+    # éventuellement sur plusieurs processus (l'ordre des lignes est conservé),
+    # et affiche le débit en messages par seconde sur la sortie d'erreur
+    params = {key: getattr(args, key, None) for key in ('shift', 'lang', 'n', 'd', 'p', 'q')}
+    source = sys.stdin if args.entree == '-' else open(args.entree, encoding='utf-8')
+    destination = sys.stdout if args.sortie == '-' else open(args.sortie, 'w', encoding='utf-8')
+    worker = functools.partial(_process_batch, mode=args.mode, fmt=args.format, params=params)
+    count = 0
+    start = time.perf_counter()
+    try:
+        batches = _batches(source, args.lot, skip_blank=args.mode == 'rsa' or args.format == 'jsonl')
+        if args.workers > 1:
+            with multiprocessing.Pool(args.workers) as pool:
+                for output in pool.imap(worker, batches):
+                    destination.write("\n".join(output) + "\n")
+                    count += len(output)
+        else:
+            for batch in batches:
+                output = worker(batch)
+                destination.write("\n".join(output) + "\n")
+                count += len(output)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if destination is not sys.stdout:
+            destination.close()
+        else:
+            destination.flush()
+    elapsed = time.perf_counter() - start
+    print(f"{count} messages traités en {elapsed:.3f} s "
+          f"({count / elapsed if elapsed > 0 else 0:.0f} messages/s)", file=sys.stderr)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Déchiffrement César / RSA en lot")
+    subparsers = parser.add_subparsers(dest='mode', required=True)
+
+    def add_common(sub):
+        sub.add_argument('entree', nargs='?', default='-', help="fichier d'entrée, un message par ligne (- = stdin)")
+        sub.add_argument('-o', '--sortie', default='-', help="fichier de sortie (- = stdout)")
+        sub.add_argument('--format', choices=['lignes', 'jsonl'], default='lignes',
+                         help="lignes brutes ou JSONL ({\"message\": ...})")
+        sub.add_argument('--workers', type=int, default=1, help="nombre de processus")
+        sub.add_argument('--lot', type=int, default=1000, help="nombre de messages par lot")
+
+    cesar = subparsers.add_parser('cesar', help="déchiffrement César avec un décalage connu")
+    cesar.add_argument('--shift', type=int, default=4)
+    add_common(cesar)
+
+    cassage = subparsers.add_parser('cassage', help="cassage César (clé inconnue)")
+    cassage.add_argument('--lang', choices=['auto', *LETTER_FREQ], default='auto')
+    add_common(cassage)
+
+    rsa = subparsers.add_parser('rsa', help="déchiffrement RSA, caractère par caractère ou par blocs "
+                                             "(entiers séparés par des virgules)")
+    rsa.add_argument('--n', type=int, required=True)
+    rsa.add_argument('--d', type=int, required=True)
+    rsa.add_argument('--p', type=int, help="facteur premier de n (active le CRT avec --q)")
+    rsa.add_argument('--q', type=int, help="facteur premier de n (active le CRT avec --p)")
+    add_common(rsa)
+    return parser.parse_args(argv)
+
+def menu_interactif():
     print("=== Démo Cryptographie ===")
     print("1. Déchiffrement César")
     print("2. Déchiffrement RSA")
-    choix = input("Choisissez une option (1 ou 2) : ")
+    print("3. Benchmark RSA (CRT + cache + processus contre pow modulo n)")
+    print("4. Cassage César (clé inconnue)")
+    choix = input("Choisissez une option (1, 2, 3 ou 4) : ")
 
     if choix == "1":
         texte = input("Entrez le texte chiffré (ex: 9153787770964) : ")
@@ -40,7 +494,25 @@ if __name__ == "__main__":
         d = int(input("Entrez d (ex: 2753) : "))
         cipher = input("Entrez la liste de nombres séparés par des virgules : ")
         cipher_list = [int(x.strip()) for x in cipher.split(",")]
-        print("Message déchiffré :", rsa_decrypt(cipher_list, d, n))
+        print("Message déchiffré :", rsa_decrypt_auto(cipher_list, d, n))
+
+    elif choix == "3":
+        bits = int(input("Taille de la clé en bits (ex: 2048) : "))
+        benchmark_rsa(bits)
+
+    elif choix == "4":
+        texte = input("Entrez le texte chiffré : ")
+        resultat = cesar_crack(texte)
+        print(f"Clé probable : {resultat['cle']} (confiance {resultat['confiance']:.2f})")
+        print("Texte déchiffré :", resultat['texte'])
 
     else:
         print("Choix invalide !")
+
+
+if __name__ == "__main__":
+    # Sans argument : menu interactif ; avec arguments : mode lot (python csr.py -h)
+    if len(sys.argv) > 1:
+        run_batch(parse_args())
+    else:
+        menu_interactif()
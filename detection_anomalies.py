@@ -1,12 +1,667 @@
 import pandas as pd
-import matplotlib.pyplot as plt
+import matplotlib.dates as mdates
+from matplotlib.figure import Figure
 import numpy as np
-import seaborn as sns
+import argparse
+import csv
+import json
+import math
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from donnees_serveur import METRIQUES, charger_donnees_serveur, convertir_temps
+
+# --- Détection en flux (une ligne à la fois, O(1) par mesure) ---
+# Les trois méthodes ci-dessous (seuil, IQR, Z-score) reposent sur des statistiques
+# globales ; en flux on les maintient de façon incrémentale :
+# - moyenne et variance par l'algorithme de Welford (numériquement stable)
+# - Q1 et Q3 par l'estimateur P² (Jain et Chlamtac) : 5 marqueurs par quantile,
+#   sans conserver les valeurs
+# Chaque mesure est comparée aux statistiques des mesures précédentes, puis les met à jour.
+
+class StatsWelford:
+    def __init__(self):
+        self.n = 0
+        self.moyenne = 0.0
+        self.m2 = 0.0
+
+    def ajouter(self, x):
+        self.n += 1
+        delta = x - self.moyenne
+        self.moyenne += delta / self.n
+        self.m2 += delta * (x - self.moyenne)
+
+    @property
+    def ecart_type(self):
+        # Écart-type corrigé (n - 1), comme pandas Series.std()
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else 0.0
+
+
+class QuantileP2:
+    def __init__(self, p):
+        self.p = p
+        self.hauteurs = []                       # valeurs des 5 marqueurs
+        self.positions = [1, 2, 3, 4, 5]         # positions réelles des marqueurs
+        self.souhaitees = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def ajouter(self, x):
+        h = self.hauteurs
+        if len(h) < 5:
+            h.append(x)
+            h.sort()
+            return
+        # Cellule contenant x (en étendant les extrêmes si besoin)
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= h[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            self.positions[i] += 1
+        for i in range(5):
+            self.souhaitees[i] += self.increments[i]
+        # Ajustement des marqueurs intermédiaires (interpolation parabolique, sinon linéaire)
+        n = self.positions
+        for i in range(1, 4):
+            d = self.souhaitees[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                q = h[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (h[i + 1] - h[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (h[i] - h[i - 1]) / (n[i] - n[i - 1]))
+                if not h[i - 1] < q < h[i + 1]:
+                    q = h[i] + d * (h[i + d] - h[i]) / (n[i + d] - n[i])
+                h[i] = q
+                n[i] += d
+
+    @property
+    def valeur(self):
+        h = self.hauteurs
+        if len(h) < 5:
+            # Démarrage : quantile exact des quelques valeurs vues
+            return h[min(len(h) - 1, int(self.p * len(h)))] if h else float('nan')
+        return h[2]
+
+
+class DetecteurFlux:
+    def __init__(self, metriques=METRIQUES, z_score_factor=2, multiplicateur_iqr=1.5,
+                 seuil_zscore=3, echauffement=30):
+        self.metriques = list(metriques)
+        self.z_score_factor = z_score_factor
+        self.multiplicateur_iqr = multiplicateur_iqr
+        self.seuil_zscore = seuil_zscore
+        self.echauffement = echauffement  # nombre de mesures avant de signaler des anomalies
+        self.stats = {m: StatsWelford() for m in self.metriques}
+        self.q1 = {m: QuantileP2(0.25) for m in self.metriques}
+        self.q3 = {m: QuantileP2(0.75) for m in self.metriques}
+
+    def limites(self, metrique):
+        # Limites courantes des trois méthodes pour une métrique
+        stats = self.stats[metrique]
+        q1, q3 = self.q1[metrique].valeur, self.q3[metrique].valeur
+        iqr = q3 - q1
+        ecart_z = self.seuil_zscore * stats.ecart_type
+        return {
+            'seuil': (None, stats.moyenne + self.z_score_factor * stats.ecart_type),
+            'iqr': (q1 - self.multiplicateur_iqr * iqr, q3 + self.multiplicateur_iqr * iqr),
+            'zscore': (stats.moyenne - ecart_z, stats.moyenne + ecart_z),
+        }
+
+    def ajouter(self, mesure):
+        # mesure : dictionnaire {métrique: valeur}. Retourne la liste des anomalies
+        # (métrique, valeur, méthode, limite_inf, limite_sup) puis met à jour les statistiques
+        anomalies = []
+        for metrique in self.metriques:
+            valeur = mesure.get(metrique)
+            if valeur is None or valeur != valeur:  # valeur absente ou NaN
+                continue
+            if self.stats[metrique].n >= self.echauffement:
+                for methode, (inf, sup) in self.limites(metrique).items():
+                    if valeur > sup or (inf is not None and valeur < inf):
+                        anomalies.append((metrique, valeur, methode, inf, sup))
+            self.stats[metrique].ajouter(valeur)
+            self.q1[metrique].ajouter(valeur)
+            self.q3[metrique].ajouter(valeur)
+        return anomalies
+
+
+def lire_lignes(source, suivre=False, intervalle=0.5):
+    # Lignes d'un fichier ou de l'entrée standard ('-') ; avec suivre=True, attend les
+    # nouvelles lignes comme `tail -f` (Ctrl+C pour arrêter)
+    f = sys.stdin if source == '-' else open(source, encoding='utf-8', newline='')
+    try:
+        tampon = ''
+        while True:
+            ligne = f.readline()
+            if not ligne:
+                if not suivre or f is sys.stdin:
+                    break
+                time.sleep(intervalle)
+                continue
+            tampon += ligne
+            if not tampon.endswith('\n') and suivre:
+                continue  # ligne en cours d'écriture
+            yield tampon
+            tampon = ''
+        if tampon:
+            yield tampon
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def detection_flux(source='-', suivre=False, sortie=None, journal=None, **options):
+    # Lit un CSV (en-tête Time + métriques) ligne par ligne et écrit chaque anomalie
+    # dès son arrivée au format CSV : Time, metrique, valeur, methode, limite_inf, limite_sup
+    # Avec un JournalEvenements, les anomalies consécutives sont aussi fusionnées en
+    # événements, ajoutés au journal dès qu'ils se terminent (horodatages normalisés comme
+    # en mode batch)
+    sortie = sortie or sys.stdout
+    fusion = FusionEvenements()
+    lecteur = csv.reader(lire_lignes(source, suivre))
+    entete = next(lecteur, None)
+    if entete is None:
+        return 0
+    colonnes = {nom: i for i, nom in enumerate(entete)}
+    metriques = [m for m in options.pop('metriques', METRIQUES) if m in colonnes]
+    if journal is not None and 'Time' not in colonnes:
+        # Sans horodatage, les événements ne peuvent pas être rangés dans le journal
+        print("Pas de colonne Time : les événements ne sont pas ajoutés au journal", file=sys.stderr)
+        journal = None
+    detecteur = DetecteurFlux(metriques, **options)
+    ecrivain = csv.writer(sortie)
+    ecrivain.writerow(['Time', 'metrique', 'valeur', 'methode', 'limite_inf', 'limite_sup'])
+    nombre = 0
+    for ligne in lecteur:
+        if not ligne:
+            continue
+        mesure = {}
+        for m in metriques:
+            try:
+                mesure[m] = float(ligne[colonnes[m]])
+            except (ValueError, IndexError):
+                pass  # valeur manquante ou illisible : ignorée pour cette métrique
+        instant = ligne[colonnes['Time']] if 'Time' in colonnes else ''
+        methodes = {m: [] for m in mesure}
+        anomalies = detecteur.ajouter(mesure)
+        for metrique, valeur, methode, inf, sup in anomalies:
+            ecrivain.writerow([instant, metrique, f"{valeur:.4f}", methode,
+                               '' if inf is None else f"{inf:.4f}", f"{sup:.4f}"])
+            methodes[metrique].append(methode)
+            nombre += 1
+        if anomalies:
+            # Fichier suivi ou entrée standard alimentée en continu : l'anomalie est
+            # transmise tout de suite, sans attendre que le tampon de sortie soit plein
+            sortie.flush()
+        if journal is not None:
+            instant = _instant_journal(instant)
+            termines = [fusion.observer(instant, m, mesure[m], methodes[m], detecteur.q1[m].valeur / 2
+                                        + detecteur.q3[m].valeur / 2) for m in mesure]
+            journal.ecrire([evenement for evenement in termines if evenement is not None])
+    if journal is not None:
+        journal.ecrire(fusion.fermer())
+    return nombre
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Détection d'anomalies sur les métriques serveur")
+    parser.add_argument('--flux', metavar='FICHIER', nargs='?', const='-',
+                        help="mode flux : lit le CSV ligne par ligne (- ou absent = entrée standard) "
+                             "et affiche les anomalies au fil de l'eau")
+    parser.add_argument('--suivre', action='store_true',
+                        help="avec --flux, attend les nouvelles lignes du fichier (comme tail -f)")
+    parser.add_argument('--echauffement', type=int, default=30,
+                        help="nombre de mesures avant de signaler des anomalies en mode flux")
+    parser.add_argument('--journal', metavar='DOSSIER', nargs='?', const=DOSSIER_EVENEMENTS,
+                        help="avec --flux, ajoute les événements fusionnés au journal")
+    parser.add_argument('--reinitialiser-journal', action='store_true',
+                        help="vide le journal des événements avant d'y écrire (par défaut, il est complété)")
+    parser.add_argument('--evenements', action='store_true',
+                        help="affiche les événements du journal (JSONL) sans relire les mesures")
+    parser.add_argument('--metrique', help="avec --evenements, filtre sur une métrique")
+    parser.add_argument('--du', help="avec --evenements, début de période (ex: 2024-07)")
+    parser.add_argument('--au', help="avec --evenements, fin de période incluse (ex: 2024-07-31)")
+    args = parser.parse_args(argv)
+    if args.reinitialiser_journal and args.flux is not None and args.journal is None:
+        parser.error("--reinitialiser-journal avec --flux nécessite --journal")
+    return args
+
+# --- Détection vectorisée (toutes les métriques en une passe) ---
+def calculer_anomalies(valeurs, z_score_factor=2, multiplicateur_iqr=1.5, seuil_zscore=3):
+    # valeurs : tableau 2-D (mesures x métriques). Toutes les statistiques sont calculées
+    # colonne par colonne en une seule fois sur le bloc, et les anomalies sont retournées
+    # sous forme de masques booléens de même forme (pas de copies de DataFrame) :
+    # {'seuil'|'iqr'|'zscore': {'masque', 'limite_inf', 'limite_sup'}, 'moyenne', 'ecart_type'}
+    valeurs = np.asarray(valeurs, dtype=float)
+    # Copie colonne par colonne contiguë : les réductions et la sélection des quantiles
+    # parcourent chaque métrique d'un bloc en mémoire
+    colonnes = np.ascontiguousarray(valeurs.T)
+    if np.isnan(colonnes).any():
+        moyenne = np.nanmean(colonnes, axis=1)
+        ecart_type = np.nanstd(colonnes, axis=1, ddof=1)  # comme pandas Series.std()
+        q1, q3 = np.nanquantile(colonnes, [0.25, 0.75], axis=1)
+    else:
+        moyenne = colonnes.mean(axis=1)
+        ecart_type = colonnes.std(axis=1, ddof=1)
+        q1, q3 = np.quantile(colonnes, [0.25, 0.75], axis=1)
+    del colonnes
+    iqr = q3 - q1
+
+    limites = {
+        'seuil': (np.full_like(moyenne, -np.inf), moyenne + z_score_factor * ecart_type),
+        'iqr': (q1 - multiplicateur_iqr * iqr, q3 + multiplicateur_iqr * iqr),
+        'zscore': (moyenne - seuil_zscore * ecart_type, moyenne + seuil_zscore * ecart_type),
+    }
+    resultats = {'moyenne': moyenne, 'ecart_type': ecart_type}
+    for methode, (inf, sup) in limites.items():
+        # Les comparaisons avec NaN sont fausses : une valeur manquante n'est jamais une anomalie
+        resultats[methode] = {'masque': (valeurs < inf) | (valeurs > sup),
+                              'limite_inf': inf, 'limite_sup': sup}
+    return resultats
+
+# --- Détection temporelle (fenêtres glissantes et saisonnalité) ---
+# Les méthodes globales signalent le pic quotidien normal et ratent un pic pendant une
+# période calme : ici chaque mesure est comparée à son contexte temporel.
+# - Z-score glissant : moyenne et écart-type des mesures de la fenêtre précédente
+#   (sommes glissantes, O(n) quelle que soit la taille de la fenêtre)
+# - IQR glissant : quartiles de la fenêtre précédente (liste à enjambements de pandas,
+#   O(n log w) en code compilé)
+# - Z-score saisonnier : moyenne et écart-type par heure de la semaine (168 créneaux),
+#   agrégés en une passe avec np.bincount
+def calculer_anomalies_temporelles(df, metriques=METRIQUES, fenetre='1D', seuil_zscore=3,
+                                   multiplicateur_iqr=1.5, min_mesures=30):
+    # df doit contenir Time, Hour et Day_of_week (les lignes sont triées par Time pour le
+    # calcul, les résultats sont rendus dans l'ordre de df). fenetre est une durée pandas
+    # ('1D', '14D'...). Chaque mesure n'est comparée qu'aux mesures qui la précèdent : la
+    # fenêtre glissante l'exclut, et la référence saisonnière de son créneau (jour de la
+    # semaine x heure) n'utilise que les mesures antérieures de ce créneau.
+    # Retourne la même structure que calculer_anomalies, avec des limites par mesure
+    # (tableaux mesures x métriques) ; NaN tant que la référence compte moins de min_mesures valeurs
+    ordre = np.argsort(df['Time'].to_numpy(), kind='stable')
+    valeurs = df[metriques].to_numpy(dtype=float)[ordre]
+    serie = pd.DataFrame(valeurs, index=pd.DatetimeIndex(df['Time'].to_numpy()[ordre]), columns=metriques)
+    glissante = serie.rolling(fenetre, closed='left', min_periods=min_mesures)
+
+    moyenne = glissante.mean().to_numpy()
+    ecart_type = glissante.std().to_numpy()
+    q1 = glissante.quantile(0.25).to_numpy()
+    q3 = glissante.quantile(0.75).to_numpy()
+    iqr = q3 - q1
+
+    # Référence saisonnière : mesures regroupées par créneau (dans l'ordre du temps), puis
+    # sommes cumulées exclusives (mesures antérieures du créneau seulement)
+    creneau = (df['Day_of_week'].to_numpy() * 24 + df['Hour'].to_numpy()).astype(np.intp)[ordre]
+    par_creneau = np.argsort(creneau, kind='stable')
+    creneaux_tries = creneau[par_creneau]
+    debuts = np.flatnonzero(np.r_[True, creneaux_tries[1:] != creneaux_tries[:-1]])
+    groupe = np.repeat(np.arange(len(debuts)), np.diff(np.r_[debuts, len(creneau)]))
+
+    def cumul_anterieur(x):
+        avant = np.cumsum(x) - x
+        return avant - avant[debuts][groupe]
+
+    moyenne_saison = np.empty_like(valeurs)
+    ecart_saison = np.empty_like(valeurs)
+    for j in range(valeurs.shape[1]):
+        colonne = valeurs[par_creneau, j]
+        valide = ~np.isnan(colonne)
+        # Décalage par une valeur de la série : sommes de petits écarts, variance plus stable
+        reference = colonne[valide][0] if valide.any() else 0.0
+        ecarts = np.where(valide, colonne - reference, 0.0)
+        nombre = cumul_anterieur(valide.astype(float))
+        somme = cumul_anterieur(ecarts)
+        somme_carres = cumul_anterieur(ecarts ** 2)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            moy = reference + somme / nombre
+            variance = np.maximum(somme_carres - somme ** 2 / nombre, 0) / (nombre - 1)
+        moy[nombre < min_mesures] = np.nan
+        moyenne_saison[par_creneau, j] = moy
+        ecart_saison[par_creneau, j] = np.sqrt(variance)
+
+    limites = {
+        'zscore_glissant': (moyenne - seuil_zscore * ecart_type, moyenne + seuil_zscore * ecart_type),
+        'iqr_glissant': (q1 - multiplicateur_iqr * iqr, q3 + multiplicateur_iqr * iqr),
+        'saisonnier': (moyenne_saison - seuil_zscore * ecart_saison,
+                       moyenne_saison + seuil_zscore * ecart_saison),
+    }
+    inverse = np.empty_like(ordre)
+    inverse[ordre] = np.arange(len(ordre))
+    valeurs = valeurs[inverse]
+    resultats = {}
+    for methode, (inf, sup) in limites.items():
+        # Limites NaN (début de série, créneau trop peu rempli) : jamais d'anomalie
+        inf, sup = inf[inverse], sup[inverse]
+        resultats[methode] = {'masque': (valeurs < inf) | (valeurs > sup),
+                              'limite_inf': inf, 'limite_sup': sup}
+    return resultats
+
+# --- Détection multivariée (corrélations entre métriques) ---
+# Les méthodes précédentes testent chaque métrique séparément : une combinaison inhabituelle
+# de valeurs individuellement normales (réseau élevé mais température basse, alors qu'elles
+# sont corrélées à 0,94) passe inaperçue.
+# - Distance de Mahalanobis : d² = (x - μ)ᵀ Σ⁻¹ (x - μ), comparée au quantile du χ² à k degrés
+#   de liberté ; Σ est calculée en une passe sur le bloc, puis O(k²) par mesure
+# - Résidu d'un modèle linéaire (moindres carrés) prédisant une métrique à partir des autres
+
+def _fonction_repartition_chi2(x, k):
+    # P(k/2, x/2) : fonction gamma incomplète régularisée, par son développement en série
+    a, y = k / 2, x / 2
+    if y <= 0:
+        return 0.0
+    terme = somme = 1 / a
+    n = 1
+    while abs(terme) > abs(somme) * 1e-15:
+        terme *= y / (a + n)
+        somme += terme
+        n += 1
+    return min(1.0, somme * math.exp(-y + a * math.log(y) - math.lgamma(a)))
+
+def quantile_chi2(k, probabilite=0.999):
+    # Quantile de la loi du χ² à k degrés de liberté par dichotomie (évite une dépendance à scipy)
+    bas, haut = 0.0, k + 10 * (2 * k) ** 0.5 + 50
+    for _ in range(100):
+        milieu = (bas + haut) / 2
+        if _fonction_repartition_chi2(milieu, k) < probabilite:
+            bas = milieu
+        else:
+            haut = milieu
+    return (bas + haut) / 2
+
+def calculer_anomalies_multivariees(valeurs, metriques=METRIQUES, cible='Temperature',
+                                    probabilite=0.999, seuil_residu=3):
+    # valeurs : tableau 2-D (mesures x métriques). Les lignes incomplètes (NaN) sont exclues
+    # de l'estimation et ne sont jamais signalées.
+    valeurs = np.asarray(valeurs, dtype=float)
+    valide = ~np.isnan(valeurs).any(axis=1)
+    x = valeurs[valide]
+    k = x.shape[1]
+
+    moyenne = x.mean(axis=0)
+    centre = x - moyenne
+    covariance = centre.T @ centre / (len(x) - 1)
+    precision = np.linalg.pinv(covariance)  # pseudo-inverse : robuste aux métriques colinéaires
+    distance2 = np.full(len(valeurs), np.nan)
+    distance2[valide] = ((centre @ precision) * centre).sum(axis=1)
+    limite = quantile_chi2(k, probabilite)
+
+    # Modèle linéaire cible ~ autres métriques + constante
+    j = metriques.index(cible)
+    explicatives = np.column_stack([np.delete(x, j, axis=1), np.ones(len(x))])
+    coefficients = np.linalg.lstsq(explicatives, x[:, j], rcond=None)[0]
+    residu = np.full(len(valeurs), np.nan)
+    residu[valide] = x[:, j] - explicatives @ coefficients
+    ecart_residu = np.nanstd(residu, ddof=explicatives.shape[1])
+
+    return {
+        'mahalanobis': {'masque': distance2 > limite, 'distance2': distance2, 'limite': limite},
+        'residu': {'masque': np.abs(residu) > seuil_residu * ecart_residu, 'residu': residu,
+                   'limite': seuil_residu * ecart_residu, 'cible': cible,
+                   'coefficients': dict(zip([m for m in metriques if m != cible] + ['constante'],
+                                            coefficients.tolist()))},
+    }
+
+# --- Journal des événements d'anomalie ---
+# Les mesures anormales consécutives d'une métrique (toutes méthodes confondues) sont
+# fusionnées en un événement : début, fin, nombre de mesures, pic (valeur la plus éloignée
+# de la médiane) et votes (nombre de mesures signalées par chaque méthode).
+# Le journal est un ensemble de fichiers JSONL partitionnés par mois (AAAA-MM.jsonl) : une
+# requête sur une période ne lit que les mois concernés, sans relire server_usage_data.csv.
+# Un événement à cheval sur plusieurs mois est écrit dans chacun. Chaque écriture porte le
+# numéro de séquence de l'exécution (horloge en ns) : à la lecture, la dernière version d'un
+# événement (métrique, début) l'emporte. Le mode batch réécrit les mois qu'il couvre ; le
+# mode flux écrit en ajout.
+DOSSIER_EVENEMENTS = 'evenements_anomalies'
+
+def _format_instant(instant):
+    return str(np.datetime_as_string(np.datetime64(instant, 's'))).replace('T', ' ')
+
+def _instant_journal(valeur):
+    # Horodatage brut d'une ligne du flux au format du journal, None s'il est illisible
+    try:
+        instant = convertir_temps(valeur)
+    except ValueError:
+        return None
+    return None if pd.isna(instant) else _format_instant(instant.to_datetime64())
+
+def extraire_evenements(temps, valeurs, masques, metrique):
+    # temps, valeurs : tableaux 1-D ; masques : {méthode: masque booléen 1-D}
+    union = np.zeros(len(valeurs), dtype=bool)
+    for masque in masques.values():
+        union |= masque
+    bords = np.diff(np.concatenate([[0], union.view(np.int8), [0]]))
+    debuts = np.flatnonzero(bords == 1)
+    fins = np.flatnonzero(bords == -1) - 1
+    # Votes par méthode et par événement avec des sommes cumulées : O(n) au total
+    cumuls = {methode: np.concatenate([[0], np.cumsum(masque)]) for methode, masque in masques.items()}
+    mediane = np.nanmedian(valeurs)
+    evenements = []
+    for debut, fin in zip(debuts, fins):
+        i_pic = debut + int(np.nanargmax(np.abs(valeurs[debut:fin + 1] - mediane)))
+        votes = {methode: int(cumul[fin + 1] - cumul[debut]) for methode, cumul in cumuls.items()}
+        evenements.append({
+            'metrique': metrique,
+            'debut': _format_instant(temps[debut]),
+            'fin': _format_instant(temps[fin]),
+            'mesures': int(fin - debut + 1),
+            'pic': float(valeurs[i_pic]),
+            'instant_pic': _format_instant(temps[i_pic]),
+            'votes': votes,
+            'nb_methodes': sum(1 for n in votes.values() if n > 0),
+        })
+    return evenements
+
+
+class FusionEvenements:
+    # Version incrémentale de extraire_evenements pour le mode flux : un événement reste
+    # ouvert tant que les mesures de la métrique sont signalées, et il est retourné à la
+    # première mesure normale
+    def __init__(self):
+        self.ouverts = {}
+
+    def observer(self, instant, metrique, valeur, methodes, mediane=0.0):
+        evenement = self.ouverts.get(metrique)
+        if not methodes:
+            return self.ouverts.pop(metrique, None)
+        if evenement is None:
+            evenement = self.ouverts[metrique] = {
+                'metrique': metrique, 'debut': instant, 'fin': instant, 'mesures': 0,
+                'pic': valeur, 'instant_pic': instant, 'votes': {}, 'nb_methodes': 0}
+        evenement['fin'] = instant
+        evenement['mesures'] += 1
+        if abs(valeur - mediane) > abs(evenement['pic'] - mediane):
+            evenement['pic'], evenement['instant_pic'] = valeur, instant
+        for methode in methodes:
+            evenement['votes'][methode] = evenement['votes'].get(methode, 0) + 1
+        evenement['nb_methodes'] = len(evenement['votes'])
+        return None
+
+    def fermer(self):
+        evenements = list(self.ouverts.values())
+        self.ouverts.clear()
+        return evenements
+
+
+class JournalEvenements:
+    def __init__(self, dossier=DOSSIER_EVENEMENTS, reinitialiser=False):
+        self.dossier = dossier
+        self.sequence = time.time_ns()
+        os.makedirs(dossier, exist_ok=True)
+        if reinitialiser:
+            for nom in os.listdir(dossier):
+                if nom.endswith('.jsonl'):
+                    os.remove(os.path.join(dossier, nom))
+
+    def _mois(self, debut, fin):
+        return [str(mois) for mois in pd.period_range(debut[:7], fin[:7], freq='M')]
+
+    def ecrire(self, evenements, couverture=None):
+        # Ajoute les événements à leurs partitions mensuelles et retourne le nombre
+        # d'événements écrits : ceux sans horodatage valide (pas de colonne Time en entrée,
+        # date illisible) ne peuvent pas être rangés par mois et sont ignorés.
+        # couverture : (début, fin) des mesures analysées (mode batch). Les mois concernés
+        # sont réécrits (fichier temporaire puis os.replace) sans les événements qui y
+        # débutent : ils sont remplacés par ceux de cette analyse
+        par_mois = {}
+        ecrits = 0
+        for evenement in evenements:
+            try:
+                mois_evenement = self._mois(evenement['debut'], evenement['fin'])
+            except (ValueError, TypeError):
+                continue
+            if not mois_evenement:
+                continue
+            ligne = json.dumps({**evenement, 'sequence': self.sequence}, ensure_ascii=False) + '\n'
+            for mois in mois_evenement:
+                par_mois.setdefault(mois, []).append(ligne)
+            ecrits += 1
+        if couverture is None:
+            for mois, lignes in par_mois.items():
+                with open(os.path.join(self.dossier, f'{mois}.jsonl'), 'a', encoding='utf-8') as f:
+                    f.writelines(lignes)
+                    f.flush()
+            return ecrits
+        debut, fin = couverture
+        for mois in sorted(set(self._mois(debut, fin)) | set(par_mois)):
+            chemin = os.path.join(self.dossier, f'{mois}.jsonl')
+            lignes = []
+            if os.path.exists(chemin):
+                with open(chemin, encoding='utf-8') as f:
+                    for ligne in f:
+                        try:
+                            evenement = json.loads(ligne)
+                        except json.JSONDecodeError:
+                            continue  # ligne tronquée par un arrêt brutal
+                        if not debut <= evenement['debut'] <= fin:
+                            lignes.append(ligne)
+            lignes += par_mois.get(mois, [])
+            if not lignes:
+                if os.path.exists(chemin):
+                    os.remove(chemin)
+                continue
+            with open(chemin + '.tmp', 'w', encoding='utf-8') as f:
+                f.writelines(lignes)
+            os.replace(chemin + '.tmp', chemin)
+        return ecrits
+
+    def lire(self, metrique=None, du=None, au=None):
+        # Événements chevauchant [du, au], triés par début. du et au sont des préfixes de
+        # date ISO ('2024-07', '2024-07-09', '2024-07-09 12:00:00') ; au est inclusif
+        fichiers = sorted(nom[:-len('.jsonl')] for nom in os.listdir(self.dossier) if nom.endswith('.jsonl'))
+        fichiers = [mois for mois in fichiers if (du is None or mois >= du[:7]) and (au is None or mois <= au[:7])]
+        borne_fin = None if au is None else au + '\uffff'
+        # Dernière version de chaque événement (séquence la plus récente, puis dernière ligne)
+        derniers = {}
+        for mois in fichiers:
+            with open(os.path.join(self.dossier, f'{mois}.jsonl'), encoding='utf-8') as f:
+                for ligne in f:
+                    try:
+                        evenement = json.loads(ligne)
+                    except json.JSONDecodeError:
+                        continue  # ligne tronquée par un arrêt brutal
+                    if metrique is not None and evenement['metrique'] != metrique:
+                        continue
+                    cle = (evenement['metrique'], evenement['debut'])
+                    sequence = evenement.pop('sequence', 0)
+                    if cle not in derniers or sequence >= derniers[cle][0]:
+                        derniers[cle] = (sequence, evenement)
+        evenements = [evenement for _, evenement in derniers.values()
+                      if not (du is not None and evenement['fin'] < du)
+                      and not (borne_fin is not None and evenement['debut'] > borne_fin)]
+        return sorted(evenements, key=lambda evenement: (evenement['debut'], evenement['metrique']))
+
+# --- Tracé des graphiques (décimation, figures réutilisées, processus parallèles) ---
+# Tracer chaque mesure brute est inutile au-delà d'une poignée de points par colonne de
+# pixels et domine le temps d'exécution sur des mois de données à la minute. La courbe est
+# décimée en gardant le minimum et le maximum de chaque colonne de pixels, pour que les pics
+# restent visibles ; les points d'anomalie sont toujours tracés exactement.
+# Chaque famille de graphiques (seuil, IQR, Z-score, comparaison) est rendue par un processus
+# qui crée sa figure et ses objets graphiques une seule fois et ne fait que mettre à jour
+# leurs données d'une métrique à l'autre.
+DPI = 100
+
+def decimer_minmax(x, y, nb_colonnes):
+    # Garde, dans l'ordre, l'indice du minimum et du maximum de y dans chacune des
+    # nb_colonnes tranches : au plus 2 x nb_colonnes points
+    n = len(y)
+    if n <= 2 * nb_colonnes:
+        return x, y
+    taille = -(-n // nb_colonnes)
+    blocs = np.full(taille * nb_colonnes, np.nan)
+    blocs[:n] = y
+    blocs = blocs.reshape(nb_colonnes, taille)
+    lignes_valides = ~np.isnan(blocs).all(axis=1)
+    blocs = blocs[lignes_valides]
+    depart = np.flatnonzero(lignes_valides) * taille
+    i_min = depart + np.nanargmin(blocs, axis=1)
+    i_max = depart + np.nanargmax(blocs, axis=1)
+    indices = np.sort(np.concatenate([i_min, i_max]))
+    return x[indices], y[indices]
+
+def preparer_graphique(fichier, titre, temps, serie, taille, courbe, nuages, lignes):
+    # Description d'un graphique à passer au processus de rendu : courbe décimée
+    # (label, couleur, alpha), nuages d'anomalies [(masque, couleur, label, alpha)]
+    # et lignes horizontales [(y, couleur, style, label)]
+    x, y = decimer_minmax(temps, serie, int(taille[0] * DPI))
+    return {
+        'fichier': fichier, 'titre': titre, 'taille': taille,
+        'courbe': (x, y) + courbe,
+        'nuages': [(temps[masque], serie[masque], couleur, label, alpha)
+                   for masque, couleur, label, alpha in nuages],
+        'lignes': lignes,
+    }
+
+def tracer_famille(graphiques):
+    # Rend une liste de graphiques de même structure avec une seule figure (sans pyplot :
+    # utilisable dans un processus de travail)
+    figure = Figure(figsize=graphiques[0]['taille'], dpi=DPI)
+    ax = figure.add_subplot()
+    ax.set_xlabel('Date et heure')
+    ax.grid(True)
+    courbe = None
+    for graphique in graphiques:
+        x, y, label, couleur, alpha = graphique['courbe']
+        if courbe is None:
+            courbe, = ax.plot(x, y, label=label, color=couleur, alpha=alpha)
+            nuages = [ax.scatter(nx, ny, color=c, label=l, s=50, alpha=a)
+                      for nx, ny, c, l, a in graphique['nuages']]
+            lignes = [ax.axhline(y=ly, color=c, linestyle=style, label=l)
+                      for ly, c, style, l in graphique['lignes']]
+        else:
+            courbe.set_data(x, y)
+            courbe.set_label(label)
+            for nuage, (nx, ny, _, l, _) in zip(nuages, graphique['nuages']):
+                nuage.set_offsets(np.column_stack([mdates.date2num(nx), ny]))
+                nuage.set_label(l)
+            for ligne, (ly, _, _, l) in zip(lignes, graphique['lignes']):
+                ligne.set_ydata([ly, ly])
+                ligne.set_label(l)
+            ax.relim()
+            ax.autoscale_view()
+        ax.set_title(graphique['titre'])
+        ax.set_ylabel(label)
+        ax.legend()
+        figure.tight_layout()
+        figure.savefig(graphique['fichier'])
+    return [graphique['fichier'] for graphique in graphiques]
+
+def tracer_graphiques(familles, workers=None):
+    # Rend les familles de graphiques en parallèle (une famille par processus)
+    workers = min(len(familles), workers or os.cpu_count() or 1)
+    if workers <= 1:
+        return [fichier for famille in familles for fichier in tracer_famille(famille)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [fichier for fichiers in executor.map(tracer_famille, familles) for fichier in fichiers]
 
 # Fonction pour gérer les erreurs
-def main():
+def main(reinitialiser_journal=False):
     try:
         # Créer un dossier pour les graphiques d'anomalies
         if not os.path.exists('anomalies'):
@@ -19,165 +674,145 @@ def main():
             print("ERREUR: Le fichier 'server_usage_data.csv' n'existe pas!")
             return
             
-        df = pd.read_csv("server_usage_data.csv")
+        df = charger_donnees_serveur()
         print(f"Données chargées avec succès: {len(df)} lignes")
-        
-        df['Time'] = pd.to_datetime(df['Time'])
-        df['Hour'] = df['Time'].dt.hour
-        df['Date'] = df['Time'].dt.date
-        df['Day_of_week'] = df['Time'].dt.dayofweek
-        df['Is_weekend'] = df['Day_of_week'].apply(lambda x: 1 if x >= 5 else 0)
 
         print("Statistiques de base:")
-        print(df[['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']].describe())
+        print(df[METRIQUES].describe())
 
-        # Calculer les Z-scores pour chaque métrique
+        # Calculer en une passe les statistiques et les anomalies des trois méthodes
         z_score_factor = 2  # Facteur Z-score pour définir les seuils (2 écarts-types)
-        
-        seuils = {}
-        for metrique in ['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']:
-            mean = df[metrique].mean()
-            std = df[metrique].std()
-            seuils[metrique] = mean + z_score_factor * std
-            
+        valeurs = df[METRIQUES].to_numpy(dtype=float)
+        temps = df['Time'].to_numpy()
+        resultats = calculer_anomalies(valeurs, z_score_factor=z_score_factor)
+
+        seuils = dict(zip(METRIQUES, resultats['seuil']['limite_sup']))
+        limites_iqr = {m: (inf, sup) for m, inf, sup in
+                       zip(METRIQUES, resultats['iqr']['limite_inf'], resultats['iqr']['limite_sup'])}
+        limites_zscore = {m: (inf, sup) for m, inf, sup in
+                          zip(METRIQUES, resultats['zscore']['limite_inf'], resultats['zscore']['limite_sup'])}
+        # Masques booléens par méthode et par métrique (vues sur les colonnes, sans copie)
+        anomalies_seuil = {m: resultats['seuil']['masque'][:, j] for j, m in enumerate(METRIQUES)}
+        anomalies_iqr = {m: resultats['iqr']['masque'][:, j] for j, m in enumerate(METRIQUES)}
+        anomalies_zscore = {m: resultats['zscore']['masque'][:, j] for j, m in enumerate(METRIQUES)}
+
         # 1. MÉTHODE PAR SEUIL (basée sur Z-score)
         print("\n1. Détection d'anomalies par SEUIL (basé sur Z-score)")
-        
-        anomalies_seuil = {}
-        for metrique in seuils:
-            anomalies_seuil[metrique] = df[df[metrique] > seuils[metrique]]
-            print(f"Anomalies {metrique} (seuil {seuils[metrique]:.2f}, Z-score = {z_score_factor}): {len(anomalies_seuil[metrique])} détectées")
+        famille_seuil = []
+
+        for j, metrique in enumerate(METRIQUES):
+            masque = anomalies_seuil[metrique]
+            print(f"Anomalies {metrique} (seuil {seuils[metrique]:.2f}, Z-score = {z_score_factor}): {masque.sum()} détectées")
             
-            # Visualiser les anomalies par seuil
-            plt.figure(figsize=(12, 6))
-            plt.plot(df['Time'], df[metrique], label=f'{metrique}', color='blue', alpha=0.5)
-            plt.scatter(anomalies_seuil[metrique]['Time'], anomalies_seuil[metrique][metrique], 
-                        color='red', label=f'Anomalies {metrique}', s=50)
-            plt.axhline(y=seuils[metrique], color='r', linestyle='--', 
-                       label=f"Seuil Z-score ({seuils[metrique]:.2f}, {z_score_factor} écarts-types)")
-            plt.title(f'Détection d\'anomalies par seuil (Z-score) - {metrique}')
-            plt.xlabel('Date et heure')
-            plt.ylabel(metrique)
-            plt.legend()
-            plt.grid(True)
-            plt.tight_layout()
-            plt.savefig(f'anomalies/anomalies_seuil_{metrique}.png')
-            plt.close()
-            print(f"Graphique sauvegardé: anomalies/anomalies_seuil_{metrique}.png")
+            famille_seuil.append(preparer_graphique(
+                f'anomalies/anomalies_seuil_{metrique}.png',
+                f'Détection d\'anomalies par seuil (Z-score) - {metrique}', temps, valeurs[:, j], (12, 6),
+                (f'{metrique}', 'blue', 0.5),
+                [(masque, 'red', f'Anomalies {metrique}', None)],
+                [(seuils[metrique], 'r', '--', f"Seuil Z-score ({seuils[metrique]:.2f}, {z_score_factor} écarts-types)")]))
 
         # 2. MÉTHODE PAR IQR
         print("\n2. Détection d'anomalies par IQR")
-        def detecter_anomalies_iqr(serie, multiplicateur=1.5):
-            Q1 = serie.quantile(0.25)
-            Q3 = serie.quantile(0.75)
-            IQR = Q3 - Q1
-            
-            limite_inf = Q1 - multiplicateur * IQR
-            limite_sup = Q3 + multiplicateur * IQR
-            
-            anomalies = serie[(serie < limite_inf) | (serie > limite_sup)]
-            return anomalies, limite_inf, limite_sup
-
-        anomalies_iqr = {}
-        limites_iqr = {}
+        famille_iqr = []
 
-        for metrique in ['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']:
-            anomalies_indices, limite_inf, limite_sup = detecter_anomalies_iqr(df[metrique])
-            anomalies_iqr[metrique] = df.loc[anomalies_indices.index]
-            limites_iqr[metrique] = (limite_inf, limite_sup)
+        for j, metrique in enumerate(METRIQUES):
+            masque = anomalies_iqr[metrique]
+            limite_inf, limite_sup = limites_iqr[metrique]
             
-            print(f"Anomalies {metrique} (IQR): {len(anomalies_iqr[metrique])} détectées")
+            print(f"Anomalies {metrique} (IQR): {masque.sum()} détectées")
             print(f"Limites IQR pour {metrique}: {limite_inf:.2f} à {limite_sup:.2f}")
             
-            # Visualiser les anomalies IQR
-            plt.figure(figsize=(12, 6))
-            plt.plot(df['Time'], df[metrique], label=f'{metrique}', color='blue', alpha=0.5)
-            plt.scatter(anomalies_iqr[metrique]['Time'], anomalies_iqr[metrique][metrique], 
-                        color='orange', label=f'Anomalies {metrique} (IQR)', s=50)
-            plt.axhline(y=limite_sup, color='orange', linestyle='--', label=f"Limite sup. IQR ({limite_sup:.2f})")
-            plt.axhline(y=limite_inf, color='orange', linestyle='--', label=f"Limite inf. IQR ({limite_inf:.2f})")
-            plt.title(f'Détection d\'anomalies par IQR - {metrique}')
-            plt.xlabel('Date et heure')
-            plt.ylabel(metrique)
-            plt.legend()
-            plt.grid(True)
-            plt.tight_layout()
-            plt.savefig(f'anomalies/anomalies_iqr_{metrique}.png')
-            plt.close()
-            print(f"Graphique sauvegardé: anomalies/anomalies_iqr_{metrique}.png")
+            famille_iqr.append(preparer_graphique(
+                f'anomalies/anomalies_iqr_{metrique}.png',
+                f'Détection d\'anomalies par IQR - {metrique}', temps, valeurs[:, j], (12, 6),
+                (f'{metrique}', 'blue', 0.5),
+                [(masque, 'orange', f'Anomalies {metrique} (IQR)', None)],
+                [(limite_sup, 'orange', '--', f"Limite sup. IQR ({limite_sup:.2f})"),
+                 (limite_inf, 'orange', '--', f"Limite inf. IQR ({limite_inf:.2f})")]))
 
         # 3. MÉTHODE PAR Z-SCORE
         print("\n3. Détection d'anomalies par Z-SCORE")
-        def detecter_anomalies_zscore(serie, seuil=3):
-            mean = serie.mean()
-            std = serie.std()
-            z_scores = (serie - mean) / std
-            
-            anomalies = serie[abs(z_scores) > seuil]
-            return anomalies, mean - seuil * std, mean + seuil * std
-
-        anomalies_zscore = {}
-        limites_zscore = {}
+        famille_zscore = []
 
-        for metrique in ['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']:
-            anomalies_indices, limite_inf, limite_sup = detecter_anomalies_zscore(df[metrique])
-            anomalies_zscore[metrique] = df.loc[anomalies_indices.index]
-            limites_zscore[metrique] = (limite_inf, limite_sup)
+        for j, metrique in enumerate(METRIQUES):
+            masque = anomalies_zscore[metrique]
+            limite_inf, limite_sup = limites_zscore[metrique]
             
-            print(f"Anomalies {metrique} (Z-score): {len(anomalies_zscore[metrique])} détectées")
+            print(f"Anomalies {metrique} (Z-score): {masque.sum()} détectées")
             print(f"Limites Z-score pour {metrique}: {limite_inf:.2f} à {limite_sup:.2f}")
             
-            # Visualiser les anomalies Z-score
-            plt.figure(figsize=(12, 6))
-            plt.plot(df['Time'], df[metrique], label=f'{metrique}', color='blue', alpha=0.5)
-            plt.scatter(anomalies_zscore[metrique]['Time'], anomalies_zscore[metrique][metrique], 
-                        color='green', label=f'Anomalies {metrique} (Z-score)', s=50)
-            plt.axhline(y=limite_sup, color='green', linestyle='--', label=f"Limite sup. Z-score ({limite_sup:.2f})")
-            plt.axhline(y=limite_inf, color='green', linestyle='--', label=f"Limite inf. Z-score ({limite_inf:.2f})")
-            plt.title(f'Détection d\'anomalies par Z-score - {metrique}')
-            plt.xlabel('Date et heure')
-            plt.ylabel(metrique)
-            plt.legend()
-            plt.grid(True)
-            plt.tight_layout()
-            plt.savefig(f'anomalies/anomalies_zscore_{metrique}.png')
-            plt.close()
-            print(f"Graphique sauvegardé: anomalies/anomalies_zscore_{metrique}.png")
+            famille_zscore.append(preparer_graphique(
+                f'anomalies/anomalies_zscore_{metrique}.png',
+                f'Détection d\'anomalies par Z-score - {metrique}', temps, valeurs[:, j], (12, 6),
+                (f'{metrique}', 'blue', 0.5),
+                [(masque, 'green', f'Anomalies {metrique} (Z-score)', None)],
+                [(limite_sup, 'green', '--', f"Limite sup. Z-score ({limite_sup:.2f})"),
+                 (limite_inf, 'green', '--', f"Limite inf. Z-score ({limite_inf:.2f})")]))
+
+        # Méthodes temporelles : contexte glissant d'une journée et saisonnalité hebdomadaire
+        print("\nDétection d'anomalies par méthodes temporelles (fenêtre glissante d'un jour, heure de la semaine)")
+        temporelles = calculer_anomalies_temporelles(df)
+        nombres_temporels = {methode: dict(zip(METRIQUES, temporelles[methode]['masque'].sum(axis=0).tolist()))
+                             for methode in temporelles}
+        for metrique in METRIQUES:
+            print(f"Anomalies {metrique}: Z-score glissant {nombres_temporels['zscore_glissant'][metrique]}, "
+                  f"IQR glissant {nombres_temporels['iqr_glissant'][metrique]}, "
+                  f"saisonnier {nombres_temporels['saisonnier'][metrique]}")
+
+        # Méthodes multivariées : anomalies conjointes invisibles métrique par métrique
+        print("\nDétection d'anomalies multivariées (Mahalanobis, résidu du modèle linéaire)")
+        multivariees = calculer_anomalies_multivariees(valeurs)
+        par_colonne = (resultats['seuil']['masque'] | resultats['iqr']['masque']
+                       | resultats['zscore']['masque']).any(axis=1)
+        nombres_multivaries = {}
+        for methode in ('mahalanobis', 'residu'):
+            masque = multivariees[methode]['masque']
+            nombres_multivaries[methode] = (int(masque.sum()), int((masque & ~par_colonne).sum()))
+        print(f"Mahalanobis (d² > {multivariees['mahalanobis']['limite']:.2f}): "
+              f"{nombres_multivaries['mahalanobis'][0]} détectées, dont "
+              f"{nombres_multivaries['mahalanobis'][1]} non détectées par les méthodes par métrique")
+        print(f"Résidu {multivariees['residu']['cible']} (|résidu| > {multivariees['residu']['limite']:.2f}): "
+              f"{nombres_multivaries['residu'][0]} détectées, dont "
+              f"{nombres_multivaries['residu'][1]} non détectées par les méthodes par métrique")
 
         # 4. GRAPHIQUE COMPARATIF DES MÉTHODES
         print("\n4. Création du graphique comparatif des méthodes")
-        for metrique in ['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']:
-            plt.figure(figsize=(15, 8))
-            
-            # Tracer les données originales
-            plt.plot(df['Time'], df[metrique], label=f'{metrique}', color='blue', alpha=0.3)
-            
-            # Tracer les anomalies détectées par chaque méthode
-            plt.scatter(anomalies_seuil[metrique]['Time'], anomalies_seuil[metrique][metrique], 
-                        color='red', label=f'Anomalies (Seuil Z-score)', s=50, alpha=0.7)
-            plt.scatter(anomalies_iqr[metrique]['Time'], anomalies_iqr[metrique][metrique], 
-                        color='orange', label=f'Anomalies (IQR)', s=50, alpha=0.7)
-            plt.scatter(anomalies_zscore[metrique]['Time'], anomalies_zscore[metrique][metrique], 
-                        color='green', label=f'Anomalies (Z-score)', s=50, alpha=0.7)
-            
-            # Tracer les limites
-            plt.axhline(y=seuils[metrique], color='red', linestyle='--', 
-                       label=f"Seuil Z-score ({seuils[metrique]:.2f}, {z_score_factor} écarts-types)")
-            plt.axhline(y=limites_iqr[metrique][1], color='orange', linestyle='--', label=f"Limite sup. IQR ({limites_iqr[metrique][1]:.2f})")
-            plt.axhline(y=limites_zscore[metrique][1], color='green', linestyle='--', label=f"Limite sup. Z-score ({limites_zscore[metrique][1]:.2f})")
-            
-            plt.title(f'Comparaison des méthodes de détection d\'anomalies - {metrique}')
-            plt.xlabel('Date et heure')
-            plt.ylabel(metrique)
-            plt.legend()
-            plt.grid(True)
-            plt.tight_layout()
-            plt.savefig(f'anomalies/comparaison_methodes_{metrique}.png')
-            plt.close()
-            print(f"Graphique comparatif sauvegardé: anomalies/comparaison_methodes_{metrique}.png")
+        famille_comparaison = []
+        for j, metrique in enumerate(METRIQUES):
+            famille_comparaison.append(preparer_graphique(
+                f'anomalies/comparaison_methodes_{metrique}.png',
+                f'Comparaison des méthodes de détection d\'anomalies - {metrique}', temps, valeurs[:, j], (15, 8),
+                (f'{metrique}', 'blue', 0.3),
+                [(anomalies_seuil[metrique], 'red', 'Anomalies (Seuil Z-score)', 0.7),
+                 (anomalies_iqr[metrique], 'orange', 'Anomalies (IQR)', 0.7),
+                 (anomalies_zscore[metrique], 'green', 'Anomalies (Z-score)', 0.7)],
+                [(seuils[metrique], 'red', '--', f"Seuil Z-score ({seuils[metrique]:.2f}, {z_score_factor} écarts-types)"),
+                 (limites_iqr[metrique][1], 'orange', '--', f"Limite sup. IQR ({limites_iqr[metrique][1]:.2f})"),
+                 (limites_zscore[metrique][1], 'green', '--', f"Limite sup. Z-score ({limites_zscore[metrique][1]:.2f})")]))
+
+        # Rendu des 16 graphiques : une famille par processus, une figure réutilisée par famille
+        for fichier in tracer_graphiques([famille_seuil, famille_iqr, famille_zscore, famille_comparaison]):
+            print(f"Graphique sauvegardé: {fichier}")
+
+        # Journal des événements : anomalies consécutives fusionnées, toutes méthodes par métrique
+        # Les mois couverts par les mesures sont réécrits avec les événements de cette analyse ;
+        # les autres mois du journal (et les événements du mode flux hors de la période) sont
+        # conservés
+        journal = JournalEvenements(reinitialiser=reinitialiser_journal)
+        evenements_par_metrique = {}
+        for j, metrique in enumerate(METRIQUES):
+            masques = {methode: resultats[methode]['masque'][:, j] for methode in ('seuil', 'iqr', 'zscore')}
+            masques.update({methode: temporelles[methode]['masque'][:, j] for methode in temporelles})
+            evenements_par_metrique[metrique] = extraire_evenements(temps, valeurs[:, j], masques, metrique)
+        ecrits = journal.ecrire([evenement for metrique in METRIQUES for evenement in evenements_par_metrique[metrique]],
+                                couverture=(_format_instant(temps.min()), _format_instant(temps.max())))
+        print(f"\nJournal des événements mis à jour dans '{DOSSIER_EVENEMENTS}/': {ecrits} événements")
 
         # 5. GÉNÉRER UN RAPPORT D'ANOMALIES
         print("\n5. Génération du rapport d'anomalies")
+        # Nombre d'anomalies par méthode et par métrique (une réduction par masque)
+        nombres = {methode: dict(zip(METRIQUES, resultats[methode]['masque'].sum(axis=0).tolist()))
+                   for methode in ('seuil', 'iqr', 'zscore')}
         with open('rapport_anomalies.txt', 'w') as f:
             f.write("RAPPORT DE DÉTECTION D'ANOMALIES\n")
             f.write("===============================\n\n")
@@ -186,24 +821,58 @@ def main():
             
             f.write("1. MÉTHODE PAR SEUIL (basée sur Z-score)\n")
             f.write(f"Facteur Z-score utilisé: {z_score_factor} écarts-types\n")
-            for metrique in seuils:
-                f.write(f"Anomalies {metrique} (seuil {seuils[metrique]:.2f}): {len(anomalies_seuil[metrique])} détectées\n")
-                if len(anomalies_seuil[metrique]) > 0:
-                    f.write(f"  - Valeur maximale: {anomalies_seuil[metrique][metrique].max():.2f} à {anomalies_seuil[metrique]['Time'].iloc[anomalies_seuil[metrique][metrique].argmax()]}\n")
+            for j, metrique in enumerate(METRIQUES):
+                f.write(f"Anomalies {metrique} (seuil {seuils[metrique]:.2f}): {nombres['seuil'][metrique]} détectées\n")
+                if nombres['seuil'][metrique] > 0:
+                    indices = np.flatnonzero(anomalies_seuil[metrique])
+                    i_max = indices[valeurs[indices, j].argmax()]
+                    f.write(f"  - Valeur maximale: {valeurs[i_max, j]:.2f} à {df['Time'].iloc[i_max]}\n")
             f.write("\n")
             
             f.write("2. MÉTHODE PAR IQR\n")
-            for metrique in ['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']:
-                f.write(f"Anomalies {metrique}: {len(anomalies_iqr[metrique])} détectées\n")
+            for metrique in METRIQUES:
+                f.write(f"Anomalies {metrique}: {nombres['iqr'][metrique]} détectées\n")
                 f.write(f"Limites IQR pour {metrique}: {limites_iqr[metrique][0]:.2f} à {limites_iqr[metrique][1]:.2f}\n")
             f.write("\n")
             
             f.write("3. MÉTHODE PAR Z-SCORE\n")
-            for metrique in ['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']:
-                f.write(f"Anomalies {metrique}: {len(anomalies_zscore[metrique])} détectées\n")
+            for metrique in METRIQUES:
+                f.write(f"Anomalies {metrique}: {nombres['zscore'][metrique]} détectées\n")
                 f.write(f"Limites Z-score pour {metrique}: {limites_zscore[metrique][0]:.2f} à {limites_zscore[metrique][1]:.2f}\n")
             f.write("\n")
             
+            f.write("4. MÉTHODES TEMPORELLES\n")
+            f.write("Z-score et IQR sur la journée précédant chaque mesure, Z-score par heure de la semaine\n")
+            f.write("| Métrique       | Z-score glissant | IQR glissant | Saisonnier |\n")
+            f.write("|----------------|------------------|--------------|------------|\n")
+            for metrique in METRIQUES:
+                f.write(f"| {metrique:<14} | {nombres_temporels['zscore_glissant'][metrique]:<16} | "
+                        f"{nombres_temporels['iqr_glissant'][metrique]:<12} | {nombres_temporels['saisonnier'][metrique]:<10} |\n")
+            f.write("\n")
+            
+            f.write("5. MÉTHODES MULTIVARIÉES\n")
+            f.write(f"Distance de Mahalanobis (seuil χ² à 99,9 %: {multivariees['mahalanobis']['limite']:.2f}): "
+                    f"{nombres_multivaries['mahalanobis'][0]} détectées, dont {nombres_multivaries['mahalanobis'][1]} "
+                    f"non détectées par les méthodes par métrique\n")
+            modele = " + ".join(f"{c:.3f} x {m}" for m, c in multivariees['residu']['coefficients'].items()
+                                if m != 'constante')
+            f.write(f"Modèle linéaire: {multivariees['residu']['cible']} = {modele} + "
+                    f"{multivariees['residu']['coefficients']['constante']:.3f}\n")
+            f.write(f"Résidus anormaux (> {multivariees['residu']['limite']:.2f}): "
+                    f"{nombres_multivaries['residu'][0]} détectés, dont {nombres_multivaries['residu'][1]} "
+                    f"non détectés par les méthodes par métrique\n")
+            f.write("\n")
+            
+            f.write("6. ÉVÉNEMENTS D'ANOMALIE (mesures consécutives fusionnées)\n")
+            for metrique in METRIQUES:
+                evenements = evenements_par_metrique[metrique]
+                f.write(f"Événements {metrique}: {len(evenements)}")
+                if evenements:
+                    plus_long = max(evenements, key=lambda evenement: evenement['mesures'])
+                    f.write(f" (le plus long: {plus_long['mesures']} mesures de {plus_long['debut']} à {plus_long['fin']})")
+                f.write("\n")
+            f.write(f"Journal détaillé: dossier '{DOSSIER_EVENEMENTS}/' (un fichier JSONL par mois)\n\n")
+            
             f.write("COMPARAISON DES MÉTHODES\n")
             f.write("=======================\n\n")
             
@@ -211,20 +880,20 @@ def main():
             f.write("| Métrique       | Seuil (Z-score) | IQR    | Z-score |\n")
             f.write("|----------------|-----------------|--------|--------|\n")
             
-            for metrique in ['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']:
-                f.write(f"| {metrique:<14} | {len(anomalies_seuil[metrique]):<15} | {len(anomalies_iqr[metrique]):<6} | {len(anomalies_zscore[metrique]):<6} |\n")
+            for metrique in METRIQUES:
+                f.write(f"| {metrique:<14} | {nombres['seuil'][metrique]:<15} | {nombres['iqr'][metrique]:<6} | {nombres['zscore'][metrique]:<6} |\n")
             
             f.write("\nRECOMMANDATIONS\n")
             f.write("==============\n\n")
             
             # Déterminer la méthode la plus appropriée pour chaque métrique
-            for metrique in ['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']:
+            for metrique in METRIQUES:
                 f.write(f"Pour {metrique}:\n")
                 
                 # Compter les anomalies par méthode
-                count_seuil = len(anomalies_seuil[metrique])
-                count_iqr = len(anomalies_iqr[metrique])
-                count_zscore = len(anomalies_zscore[metrique])
+                count_seuil = nombres['seuil'][metrique]
+                count_iqr = nombres['iqr'][metrique]
+                count_zscore = nombres['zscore'][metrique]
                 
                 if count_seuil == 0 and count_iqr == 0 and count_zscore == 0:
                     f.write("  - Aucune anomalie détectée par les trois méthodes. Les données semblent normales.\n")
@@ -252,10 +921,23 @@ def main():
         print("\nAnalyse terminée! Les résultats ont été enregistrés dans:")
         print("- Dossier 'anomalies/' pour les graphiques")
         print("- Fichier 'rapport_anomalies.txt' pour le rapport détaillé")
+        print(f"- Dossier '{DOSSIER_EVENEMENTS}/' pour le journal des événements")
         
     except Exception as e:
         print(f"Une erreur s'est produite: {str(e)}")
         print(f"Détails: {sys.exc_info()}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    if args.evenements:
+        for evenement in JournalEvenements(args.journal or DOSSIER_EVENEMENTS).lire(args.metrique, args.du, args.au):
+            print(json.dumps(evenement, ensure_ascii=False))
+    elif args.flux is not None:
+        journal = JournalEvenements(args.journal, args.reinitialiser_journal) if args.journal else None
+        try:
+            total = detection_flux(args.flux, args.suivre, journal=journal, echauffement=args.echauffement)
+            print(f"{total} anomalies détectées", file=sys.stderr)
+        except KeyboardInterrupt:
+            pass
+    else:
+        main(reinitialiser_journal=args.reinitialiser_journal)
\ No newline at end of file
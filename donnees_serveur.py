@@ -0,0 +1,626 @@
+import csv
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from benchmark_harness import file_hash
+
+# Chargement commun des mesures serveur (test.py, graphiques_serveur.py, detection_anomalies.py)
+# Le CSV est analysé avec des types explicites et un format de date fixe, les colonnes
+# calendaires sont dérivées de façon vectorisée, et le résultat est conservé dans un cache
+# binaire .npz : les outils lancés l'un après l'autre n'analysent le CSV qu'une fois.
+# Le cache est invalidé si la taille du CSV change ; si seule sa date de modification
+# change, son empreinte SHA-256 décide (un simple `touch` ne force pas de nouvelle analyse).
+
+FICHIER_SERVEUR = "server_usage_data.csv"
+METRIQUES = ['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']
+FORMAT_DATE = '%Y-%m-%d %H:%M:%S'
+TYPES_COLONNES = {metrique: np.float64 for metrique in METRIQUES}
+COLONNES_CALENDAIRES = ['Hour', 'Date', 'Day_of_week', 'Is_weekend']
+
+
+def _chemins_cache(chemin):
+    dossier = os.path.join(os.path.dirname(os.path.abspath(chemin)), '.cache')
+    nom = os.path.splitext(os.path.basename(chemin))[0]
+    return dossier, os.path.join(dossier, nom + '.npz'), os.path.join(dossier, nom + '.json')
+
+
+def ajouter_calendrier(df):
+    # Colonnes calendaires dérivées de Time (modifie df et le retourne)
+    temps = df['Time'].dt
+    df['Hour'] = temps.hour
+    df['Date'] = temps.date
+    df['Day_of_week'] = temps.dayofweek
+    df['Is_weekend'] = (df['Day_of_week'] >= 5).astype(np.int64)
+    return df
+
+
+def convertir_temps(valeurs):
+    # Horodatages du CSV en datetime64 : format habituel (rapide), sinon tout format ISO
+    # (fractions de seconde, fuseau...). Utilisé par tous les modes de lecture, pour
+    # qu'ils acceptent les mêmes fichiers
+    try:
+        return pd.to_datetime(valeurs, format=FORMAT_DATE)
+    except ValueError:
+        return pd.to_datetime(valeurs, format='ISO8601')
+
+
+def _analyser_csv(chemin):
+    df = pd.read_csv(chemin, dtype=TYPES_COLONNES)
+    df['Time'] = convertir_temps(df['Time'])
+    return df
+
+
+def _cache_valide(chemin, meta_path):
+    # Retourne True si le cache correspond au CSV (en mettant à jour la date de modification
+    # mémorisée quand le contenu est inchangé)
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    stat = os.stat(chemin)
+    if meta.get('taille') != stat.st_size:
+        return False
+    if meta.get('mtime_ns') == stat.st_mtime_ns:
+        return True
+    if meta.get('sha256') != file_hash(chemin):
+        return False
+    meta['mtime_ns'] = stat.st_mtime_ns
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return True
+
+
+def _ecrire_signature(chemin, meta_path, **autres):
+    stat = os.stat(chemin)
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump({'taille': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': file_hash(chemin), **autres}, f)
+
+
+def _ecrire_cache(df, chemin, dossier, cache_path, meta_path):
+    colonnes = {nom: df[nom].to_numpy() for nom in df.columns if nom != 'Date'}
+    if any(valeurs.dtype == object for valeurs in colonnes.values()):
+        return  # colonnes texte : pas de cache binaire sans pickle
+    os.makedirs(dossier, exist_ok=True)
+    # Écrire dans un fichier temporaire puis renommer pour ne jamais laisser de cache partiel
+    tmp_path = cache_path + '.tmp.npz'
+    np.savez(tmp_path, __colonnes__=np.array(list(colonnes)), **colonnes)
+    os.replace(tmp_path, cache_path)
+    _ecrire_signature(chemin, meta_path)
+
+
+def _lire_cache(cache_path):
+    with np.load(cache_path, allow_pickle=False) as archive:
+        return pd.DataFrame({str(nom): archive[nom] for nom in archive['__colonnes__']})
+
+
+def charger_donnees_serveur(chemin=FICHIER_SERVEUR, calendrier=True, utiliser_cache=True):
+    # Retourne le DataFrame des mesures (Time en datetime64, métriques en float64), avec les
+    # colonnes Hour, Date, Day_of_week et Is_weekend si calendrier est vrai.
+    # Avec calendrier=False, seules les colonnes du CSV sont retournées (pour nettoyer les
+    # données avant d'appeler ajouter_calendrier).
+    # df.attrs['signature'] (taille et date de modification du CSV lu) permet à charger_cumuls
+    # et moyennes_par de vérifier qu'ils portent sur la même version du fichier.
+    dossier, cache_path, meta_path = _chemins_cache(chemin)
+    if utiliser_cache and os.path.exists(cache_path) and _cache_valide(chemin, meta_path):
+        stat = os.stat(chemin)
+        df = _lire_cache(cache_path)
+    else:
+        stat = os.stat(chemin)
+        df = _analyser_csv(chemin)
+        if utiliser_cache:
+            ajouter_calendrier(df)
+            _ecrire_cache(df, chemin, dossier, cache_path, meta_path)
+    df.attrs['signature'] = {'taille': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    if not calendrier:
+        return df.drop(columns=[c for c in COLONNES_CALENDAIRES if c in df.columns])
+    if 'Date' not in df.columns:
+        # Date (objets datetime.date) n'est pas stockée dans le cache : elle est redérivée
+        if 'Hour' in df.columns:
+            df['Date'] = df['Time'].dt.date
+            df = df[[c for c in df.columns if c not in COLONNES_CALENDAIRES] + COLONNES_CALENDAIRES]
+        else:
+            ajouter_calendrier(df)
+    return df
+
+
+# --- Classements (k premières lignes, index trié sur disque) ---
+def indices_top_k(valeurs, k):
+    # Positions des k plus grandes valeurs, par ordre décroissant, en O(n) : sélection
+    # partielle (argpartition) puis tri des seuls candidats. À valeur égale, la première
+    # position l'emporte (comme idxmax), y compris pour les ex aequo au k-ième rang.
+    # Les valeurs manquantes (NaN) sont ignorées, comme avec nlargest.
+    valeurs = np.asarray(valeurs, dtype=float)
+    positions = np.flatnonzero(~np.isnan(valeurs))
+    if len(positions) < len(valeurs):
+        valeurs = valeurs[positions]
+    else:
+        positions = None
+    k = min(k, len(valeurs))
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    seuil = valeurs[np.argpartition(valeurs, len(valeurs) - k)[len(valeurs) - k]]
+    candidats = np.flatnonzero(valeurs >= seuil)
+    ordre = np.lexsort((candidats, -valeurs[candidats]))
+    meilleurs = candidats[ordre[:k]]
+    return meilleurs if positions is None else positions[meilleurs]
+
+
+def top_k(df, critere, k=5):
+    # Les k lignes de df ayant les plus grandes valeurs de critere (sans trier df)
+    return df.iloc[indices_top_k(df[critere].to_numpy(), k)]
+
+
+# Un index de classement remplace une copie triée du CSV : c'est un tableau .npy des
+# positions (en octets) des lignes du CSV, rangées par valeur décroissante du critère.
+# Lire les n premières lignes du classement ne demande que n accès directs au CSV.
+# Hypothèse : pas de retour à la ligne à l'intérieur d'un champ (cas des CSV de mesures).
+
+def decalages_lignes(chemin, taille_bloc=1 << 24):
+    # Position en octets du début de chaque ligne de données (en-tête exclu). Les lignes
+    # vides, que read_csv ignore, sont exclues : la i-ème position est celle de la ligne
+    # d'index i du DataFrame lu
+    fins, retours = [], []
+    position = 0
+    with open(chemin, 'rb') as f:
+        while True:
+            bloc = f.read(taille_bloc)
+            if not bloc:
+                break
+            octets = np.frombuffer(bloc, dtype=np.uint8)
+            fins.append(np.flatnonzero(octets == ord('\n')) + position)
+            retours.append(np.flatnonzero(octets == ord('\r')) + position)
+            position += len(bloc)
+    fins = np.concatenate(fins) if fins else np.empty(0, dtype=np.int64)
+    debuts = np.r_[0, fins + 1].astype(np.int64)
+    longueurs = np.r_[fins, position] - debuts
+    retours = np.concatenate(retours) if retours else np.empty(0, dtype=np.int64)
+    vide = (longueurs == 0) | ((longueurs == 1) & np.isin(debuts, retours))  # '' ou '\r' (CRLF)
+    return debuts[~vide][1:]  # la première ligne non vide est l'en-tête
+
+
+def _chemins_index(chemin, critere):
+    dossier, cache_path, _ = _chemins_cache(chemin)
+    base = cache_path[:-len('.npz')] + f'.classement_{critere}'
+    return dossier, base + '.npy', base + '.json'
+
+
+def ecrire_index_classement(df, critere, chemin=FICHIER_SERVEUR):
+    # df doit provenir de charger_donnees_serveur(chemin) : son index est le numéro de la
+    # ligne de données dans le CSV (éventuellement après suppression de lignes)
+    dossier, index_path, meta_path = _chemins_index(chemin, critere)
+    os.makedirs(dossier, exist_ok=True)
+    ordre = np.argsort(-df[critere].to_numpy(dtype=float), kind='stable')
+    decalages = decalages_lignes(chemin)[df.index.to_numpy()[ordre]]
+    tmp_path = index_path + '.tmp.npy'
+    np.save(tmp_path, decalages)
+    os.replace(tmp_path, index_path)
+    _ecrire_signature(chemin, meta_path, critere=critere)
+    return index_path
+
+
+def lire_classement(critere, debut=0, fin=5, chemin=FICHIER_SERVEUR):
+    # Lignes de rang debut à fin (exclu) du classement par critere, lues directement dans
+    # le CSV grâce à l'index ; None si l'index est absent ou si le CSV a changé depuis
+    _, index_path, meta_path = _chemins_index(chemin, critere)
+    if not os.path.exists(index_path) or not _cache_valide(chemin, meta_path):
+        return None
+    decalages = np.load(index_path, mmap_mode='r')[debut:fin]
+    with open(chemin, encoding='utf-8') as f:
+        entete = f.readline()
+        while entete and not entete.strip('\r\n'):
+            entete = f.readline()  # lignes vides avant l'en-tête
+        lignes = []
+        for decalage in decalages:
+            f.seek(int(decalage))
+            ligne = f.readline()
+            lignes.append(ligne if ligne.endswith('\n') else ligne + '\n')  # dernière ligne du fichier
+    df = pd.read_csv(io.StringIO(entete + ''.join(lignes)), dtype=TYPES_COLONNES)
+    df['Time'] = convertir_temps(df['Time'])
+    return df
+
+
+# --- Doublons (empreinte 64 bits par ligne) ---
+class EmpreintesVues:
+    # Ensemble des empreintes des lignes déjà vues, en séries triées disjointes : chaque bloc
+    # ajoute une série, et les deux dernières sont fusionnées tant que l'avant-dernière n'est
+    # pas plus de deux fois plus grande. Le nombre de séries reste logarithmique et chaque
+    # empreinte n'est recopiée qu'O(log n) fois (au lieu de tout le tableau à chaque bloc)
+    def __init__(self):
+        self.series = []
+
+    def __len__(self):
+        return sum(len(serie) for serie in self.series)
+
+    def contient(self, valeurs):
+        presentes = np.zeros(len(valeurs), dtype=bool)
+        for serie in self.series:
+            positions = np.searchsorted(serie, valeurs)
+            dedans = positions < len(serie)
+            dedans[dedans] = serie[positions[dedans]] == valeurs[dedans]
+            presentes |= dedans
+        return presentes
+
+    def ajouter(self, valeurs):
+        # valeurs : empreintes triées, absentes de l'ensemble
+        if not len(valeurs):
+            return
+        self.series.append(valeurs)
+        while len(self.series) >= 2 and len(self.series[-2]) <= 2 * len(self.series[-1]):
+            # Deux séries triées : le tri stable (timsort) les fusionne en temps linéaire
+            fusion = np.sort(np.concatenate(self.series[-2:]), kind='stable')
+            self.series[-2:] = [fusion]
+
+    def tableau(self):
+        # Toutes les empreintes en un seul tableau trié
+        if len(self.series) > 1:
+            self.series = [np.sort(np.concatenate(self.series), kind='stable')]
+        return self.series[0] if self.series else np.empty(0, dtype=np.uint64)
+
+
+def dedoublonner(vues, bloc, deja_vues=()):
+    # Retourne le masque des doublons de bloc et ajoute les autres lignes à vues
+    # (EmpreintesVues). deja_vues : tableaux triés d'empreintes consultés sans être modifiés.
+    # À l'intérieur du bloc, la première occurrence d'une ligne est conservée (comme
+    # DataFrame.duplicated)
+    nouvelles = pd.util.hash_pandas_object(bloc, index=False).to_numpy()
+    _, premieres = np.unique(nouvelles, return_index=True)
+    doublon = np.ones(len(bloc), dtype=bool)
+    doublon[premieres] = False
+    doublon |= vues.contient(nouvelles)
+    for connues in deja_vues:
+        positions = np.searchsorted(connues, nouvelles)
+        deja_vu = positions < len(connues)
+        deja_vu[deja_vu] = connues[positions[deja_vu]] == nouvelles[deja_vu]
+        doublon |= deja_vu
+    vues.ajouter(np.sort(nouvelles[~doublon]))
+    return doublon
+
+
+# --- Cumuls par intervalle de temps (pré-agrégats) ---
+# Pour chaque granularité, une ligne par intervalle non vide : début de l'intervalle (en
+# secondes), effectif, et par métrique somme, somme des carrés, minimum et maximum. Les
+# moyennes par heure de la journée, par jour de la semaine ou semaine/weekend se calculent
+# à partir des cumuls horaires ou journaliers (168 ou 7 lignes par semaine) au lieu des
+# mesures à la minute. Les cumuls portent sur les mesures nettoyées (doublons et lignes
+# incomplètes retirés, comme dans test.py).
+# Le magasin est un dossier de .cache/ : un fichier d'enregistrements de taille fixe par
+# granularité, triés par début d'intervalle, et des séries triées d'empreintes de lignes
+# (ajoutées à chaque mise à jour, fusionnées quand elles deviennent trop nombreuses). Le
+# fichier meta.json retient la position (en octets) de la fin des données déjà cumulées :
+# quand des lignes sont ajoutées à la fin du CSV, seules ces lignes sont lues, et seuls les
+# enregistrements à partir du premier intervalle touché sont réécrits. Si l'en-tête ou la
+# fin de la partie déjà lue (FENETRE_CONTROLE octets) a changé, les cumuls sont reconstruits.
+
+GRANULARITES = {'5min': 300, '1h': 3600, '1D': 86400}  # de la plus fine à la plus grossière
+CUMULS_VERSION = 3
+FENETRE_CONTROLE = 1 << 16
+# Période (en secondes) dont dépend chaque regroupement calendaire
+_PERIODES_CALENDAIRES = {'Hour': 3600, 'Date': 86400, 'Day_of_week': 86400, 'Is_weekend': 86400}
+
+
+def _type_cumuls():
+    m = len(METRIQUES)
+    return np.dtype([('debut', np.int64), ('effectif', np.int64), ('somme', np.float64, m),
+                     ('somme_carres', np.float64, m), ('minimum', np.float64, m), ('maximum', np.float64, m)])
+
+
+def _cumuler(secondes, valeurs, pas):
+    # Cumuls par intervalle de pas secondes de mesures quelconques (non triées)
+    cles = secondes // pas * pas
+    ordre = np.argsort(cles, kind='stable')
+    cles, valeurs = cles[ordre], valeurs[ordre]
+    debuts = np.flatnonzero(np.r_[True, cles[1:] != cles[:-1]])
+    cumuls = np.empty(len(debuts), dtype=_type_cumuls())
+    cumuls['debut'] = cles[debuts]
+    cumuls['effectif'] = np.diff(np.r_[debuts, len(cles)])
+    cumuls['somme'] = np.add.reduceat(valeurs, debuts)
+    cumuls['somme_carres'] = np.add.reduceat(valeurs ** 2, debuts)
+    cumuls['minimum'] = np.minimum.reduceat(valeurs, debuts)
+    cumuls['maximum'] = np.maximum.reduceat(valeurs, debuts)
+    return cumuls
+
+
+def _fusionner_cumuls(cumuls, nouveaux):
+    # Ajoute nouveaux à cumuls (deux tableaux triés par début d'intervalle)
+    if not len(cumuls):
+        return nouveaux
+    debut = np.union1d(cumuls['debut'], nouveaux['debut'])
+    anciens, ajouts = np.searchsorted(debut, cumuls['debut']), np.searchsorted(debut, nouveaux['debut'])
+    resultat = np.zeros(len(debut), dtype=cumuls.dtype)
+    resultat['debut'] = debut
+    resultat['minimum'] = np.inf
+    resultat['maximum'] = -np.inf
+    resultat[anciens] = cumuls
+    for champ, operation in (('effectif', np.add), ('somme', np.add), ('somme_carres', np.add),
+                             ('minimum', np.minimum), ('maximum', np.maximum)):
+        resultat[champ][ajouts] = operation(resultat[champ][ajouts], nouveaux[champ])
+    return resultat
+
+
+def choisir_granularite(periode, du=None, au=None):
+    # La granularité la plus grossière (donc la plus petite table) dont les intervalles ne
+    # chevauchent ni une limite de groupe (periode en secondes) ni les bornes du/au ; None si
+    # aucune ne convient (la question doit alors être posée aux mesures brutes)
+    bornes = [int(pd.Timestamp(b).value // 1_000_000_000) for b in (du, au) if b is not None]
+    for nom, pas in reversed(GRANULARITES.items()):
+        if periode % pas == 0 and all(b % pas == 0 for b in bornes):
+            return nom
+    return None
+
+
+class CumulsTemporels:
+    # Les enregistrements lus sur disque (base) ne sont pas copiés : les nouvelles mesures
+    # sont cumulées dans une file en mémoire qui reprend la base à partir du premier
+    # intervalle touché (coupure) ; seule cette file est réécrite à l'enregistrement.
+    def __init__(self):
+        self._base = {nom: np.empty(0, dtype=_type_cumuls()) for nom in GRANULARITES}
+        self._coupure = {nom: 0 for nom in GRANULARITES}
+        self._file = {nom: np.empty(0, dtype=_type_cumuls()) for nom in GRANULARITES}
+        self.series_empreintes = []  # empreintes des mises à jour précédentes (tableaux triés)
+        self.empreintes = EmpreintesVues()  # empreintes des lignes ajoutées depuis
+        self.lignes_lues = 0
+        self.doublons = 0
+        self.manquantes = 0
+        self.signature = None  # taille (octets cumulés) et date de modification du CSV
+
+    def niveau(self, nom):
+        if not len(self._file[nom]):
+            return self._base[nom][:self._coupure[nom]]
+        return np.concatenate([self._base[nom][:self._coupure[nom]], self._file[nom]])
+
+    @property
+    def n(self):
+        return int(self.niveau('1D')['effectif'].sum())
+
+    def ajouter(self, bloc):
+        # bloc : lignes du CSV, Time brut ou déjà converti. Les doublons sont repérés sur les
+        # lignes converties (comme DataFrame.duplicated dans test.py), pour que les empreintes
+        # ne dépendent pas de la façon dont le fichier a été lu
+        self.lignes_lues += len(bloc)
+        bloc = bloc.assign(Time=convertir_temps(bloc['Time']).to_numpy(dtype='datetime64[us]'))
+        doublon = dedoublonner(self.empreintes, bloc, self.series_empreintes)
+        self.doublons += int(doublon.sum())
+        self.manquantes += int(bloc[doublon].isna().sum().sum())
+        bloc = bloc[~doublon].dropna()
+        if bloc.empty:
+            return
+        secondes = bloc['Time'].to_numpy().astype(np.int64) // 1_000_000
+        valeurs = bloc[METRIQUES].to_numpy(dtype=float)
+        for nom, pas in GRANULARITES.items():
+            nouveaux = _cumuler(secondes, valeurs, pas)
+            base, coupure = self._base[nom], self._coupure[nom]
+            premier = np.searchsorted(base['debut'][:coupure], nouveaux['debut'][0])
+            if premier < coupure:
+                # Intervalles déjà enregistrés touchés : ils passent de la base à la file
+                self._file[nom] = np.concatenate([base[premier:coupure], self._file[nom]])
+                self._coupure[nom] = premier
+            self._file[nom] = _fusionner_cumuls(self._file[nom], nouveaux)
+
+    def statistiques(self, par=None, du=None, au=None):
+        # Effectif, moyenne, écart-type, minimum et maximum de chaque métrique, regroupés par
+        # une colonne calendaire (Hour, Date, Day_of_week, Is_weekend), par intervalle de
+        # temps ('15min', '6h', '1D'...) ou sur l'ensemble (par=None), pour les mesures de
+        # [du, au). Colonnes : (statistique, métrique), ex. statistiques('Hour')['mean'].
+        periode = (_PERIODES_CALENDAIRES[par] if par in _PERIODES_CALENDAIRES
+                   else GRANULARITES['1D'] if par is None else int(pd.Timedelta(par).total_seconds()))
+        nom = choisir_granularite(periode, du, au)
+        if nom is None:
+            raise ValueError(f"Regroupement {par!r} sur [{du}, {au}) non couvert par les cumuls "
+                             f"({', '.join(GRANULARITES)})")
+        cumuls = self.niveau(nom)
+        garder = np.ones(len(cumuls), dtype=bool)
+        if du is not None:
+            garder &= cumuls['debut'] >= pd.Timestamp(du).value // 1_000_000_000
+        if au is not None:
+            garder &= cumuls['debut'] < pd.Timestamp(au).value // 1_000_000_000
+        cumuls = cumuls[garder]
+        debut = cumuls['debut']
+
+        jours = debut // 86400
+        if par is None:
+            cles, etiquettes = np.zeros(len(debut), dtype=np.int64), pd.Index(['total'])
+        elif par == 'Hour':
+            cles = debut // 3600 % 24
+        elif par in ('Day_of_week', 'Is_weekend'):
+            cles = (jours + 3) % 7  # le 1er janvier 1970 était un jeudi
+            if par == 'Is_weekend':
+                cles = (cles >= 5).astype(np.int64)
+        else:
+            cles = jours if par == 'Date' else debut // periode
+        if par is not None:
+            cles, inverse = np.unique(cles, return_inverse=True)
+            if par == 'Date':
+                etiquettes = pd.Index(pd.to_datetime(cles, unit='D').date, name=par)
+            elif par in _PERIODES_CALENDAIRES:
+                etiquettes = pd.Index(cles, name=par)
+            else:
+                etiquettes = pd.DatetimeIndex(pd.to_datetime(cles * periode, unit='s'), name='Time')
+        else:
+            inverse = cles
+
+        groupes = len(etiquettes)
+        effectif = np.bincount(inverse, weights=cumuls['effectif'], minlength=groupes)
+        somme = np.zeros((groupes, len(METRIQUES)))
+        somme_carres = np.zeros_like(somme)
+        minimum = np.full_like(somme, np.inf)
+        maximum = np.full_like(somme, -np.inf)
+        np.add.at(somme, inverse, cumuls['somme'])
+        np.add.at(somme_carres, inverse, cumuls['somme_carres'])
+        np.minimum.at(minimum, inverse, cumuls['minimum'])
+        np.maximum.at(maximum, inverse, cumuls['maximum'])
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            moyenne = somme / effectif[:, None]
+            variance = np.maximum(somme_carres - somme * moyenne, 0) / (effectif[:, None] - 1)
+        blocs = {'count': np.repeat(effectif[:, None], len(METRIQUES), axis=1), 'mean': moyenne,
+                 'std': np.sqrt(variance), 'min': minimum, 'max': maximum}
+        return pd.concat({stat: pd.DataFrame(valeurs, index=etiquettes, columns=METRIQUES)
+                          for stat, valeurs in blocs.items()}, axis=1)
+
+
+def moyennes_par(df, cumuls, cle):
+    # Moyennes par groupe calculées à partir des cumuls horaires ou journaliers s'ils portent
+    # sur les mêmes mesures que df : même version du CSV (signature de charger_donnees_serveur
+    # et de charger_cumuls) et même nombre de lignes (df sans doublons ni ligne incomplète) ;
+    # sinon à partir de df
+    if (cumuls is not None and cumuls.signature is not None
+            and cumuls.signature == df.attrs.get('signature') and cumuls.n == len(df)):
+        return cumuls.statistiques(cle)['mean']
+    return df.groupby(cle)[METRIQUES].mean()
+
+def _dossier_cumuls(chemin):
+    _, cache_path, _ = _chemins_cache(chemin)
+    return cache_path[:-len('.npz')] + '.cumuls'
+
+
+def _empreinte_plage(f, debut, fin):
+    # Empreinte SHA-256 des octets [debut, fin) d'un fichier ouvert en binaire
+    f.seek(debut)
+    return hashlib.sha256(f.read(fin - debut)).hexdigest()
+
+
+def _fin_derniere_ligne(f, debut, fin, taille_bloc=1 << 16):
+    # Position qui suit le dernier retour à la ligne de [debut, fin), debut s'il n'y en a pas
+    # (seule la fin du fichier est lue)
+    while fin > debut:
+        position = max(debut, fin - taille_bloc)
+        f.seek(position)
+        trouve = f.read(fin - position).rfind(b'\n')
+        if trouve >= 0:
+            return position + trouve + 1
+        fin = position
+    return debut
+
+
+class _Tranche(io.RawIOBase):
+    # Octets [debut, fin) d'un fichier ouvert en binaire, lus au fur et à mesure
+    def __init__(self, f, debut, fin):
+        f.seek(debut)
+        self._f, self._restant = f, fin - debut
+
+    def readable(self):
+        return True
+
+    def readinto(self, tampon):
+        lus = self._f.readinto(memoryview(tampon)[:self._restant]) if self._restant > 0 else 0
+        self._restant -= lus
+        return lus
+
+
+def _ecrire_meta(dossier, meta):
+    tmp_path = os.path.join(dossier, 'meta.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(dossier, 'meta.json'))
+
+
+def _lire_cumuls(dossier, meta):
+    cumuls = CumulsTemporels()
+    for nom in GRANULARITES:
+        chemin_niveau = os.path.join(dossier, nom + '.bin')
+        if os.path.getsize(chemin_niveau):
+            cumuls._base[nom] = np.memmap(chemin_niveau, dtype=_type_cumuls(), mode='r')
+            cumuls._coupure[nom] = len(cumuls._base[nom])
+    cumuls.series_empreintes = [np.memmap(os.path.join(dossier, nom), dtype=np.uint64, mode='r')
+                                for nom in meta['series_empreintes']]
+    cumuls.lignes_lues, cumuls.doublons, cumuls.manquantes = meta['lignes_lues'], meta['doublons'], meta['manquantes']
+    if 'mtime_ns' in meta:
+        cumuls.signature = {'taille': meta['octets'], 'mtime_ns': meta['mtime_ns']}
+    return cumuls
+
+
+def _enregistrer_cumuls(cumuls, dossier, meta):
+    # Réécrit la fin de chaque fichier de niveau à partir de la coupure et ajoute les
+    # nouvelles empreintes comme une série ; meta.json est marqué « en cours » pendant
+    # l'écriture, pour qu'une interruption provoque une reconstruction au lieu d'un double comptage
+    _ecrire_meta(dossier, {**meta, 'en_cours': True})
+    for nom in GRANULARITES:
+        coupure = cumuls._coupure[nom]
+        cumuls._base[nom] = np.empty(0, dtype=_type_cumuls())  # libère la projection du fichier
+        with open(os.path.join(dossier, nom + '.bin'), 'r+b') as f:
+            f.truncate(coupure * _type_cumuls().itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(cumuls._file[nom].tobytes())
+
+    series = list(meta['series_empreintes'])
+    if len(cumuls.empreintes):
+        series.append(f"empreintes.{meta['prochaine_serie']}.u64")
+        meta['prochaine_serie'] += 1
+        cumuls.empreintes.tableau().tofile(os.path.join(dossier, series[-1]))
+    cumuls.series_empreintes = []
+    # Fusion des deux dernières séries tant que l'avant-dernière n'est pas nettement plus
+    # grande : le nombre de séries reste logarithmique, chaque empreinte est réécrite peu souvent
+    tailles = [os.path.getsize(os.path.join(dossier, nom)) for nom in series]
+    while len(series) >= 2 and tailles[-2] <= 2 * tailles[-1]:
+        fusion = np.sort(np.concatenate([np.fromfile(os.path.join(dossier, nom), dtype=np.uint64)
+                                         for nom in series[-2:]]))
+        nom = f"empreintes.{meta['prochaine_serie']}.u64"
+        meta['prochaine_serie'] += 1
+        fusion.tofile(os.path.join(dossier, nom))
+        for ancien in series[-2:]:
+            os.remove(os.path.join(dossier, ancien))
+        series[-2:], tailles[-2:] = [nom], [fusion.nbytes]
+    meta['series_empreintes'] = series
+    meta.update(lignes_lues=cumuls.lignes_lues, doublons=cumuls.doublons, manquantes=cumuls.manquantes)
+    _ecrire_meta(dossier, meta)
+    return _lire_cumuls(dossier, meta)
+
+
+def charger_cumuls(chemin=FICHIER_SERVEUR, df=None, taille_bloc=1_000_000):
+    # Cumuls à jour pour le CSV : relus depuis .cache/, complétés avec les seules lignes
+    # ajoutées depuis la dernière mise à jour, ou reconstruits si le fichier a été réécrit.
+    # Une dernière ligne sans retour à la ligne (en cours d'écriture) est laissée pour plus tard.
+    # df : lignes du CSV déjà chargées par charger_donnees_serveur(chemin) (avant nettoyage) ;
+    # une reconstruction les reprend au lieu de relire le fichier si elles en sont la version
+    # actuelle complète.
+    dossier = _dossier_cumuls(chemin)
+    meta_path = os.path.join(dossier, 'meta.json')
+    stat = os.stat(chemin)
+    with open(chemin, 'rb') as f:
+        entete = f.readline()
+        meta = None
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as fm:
+                meta = json.load(fm)
+            if (meta.get('version') != CUMULS_VERSION or meta.get('en_cours') or meta['octets'] > stat.st_size
+                    or meta['entete'] != entete.decode('utf-8', 'replace')):
+                meta = None
+            elif meta['mtime_ns'] == stat.st_mtime_ns and meta['octets'] == stat.st_size:
+                return _lire_cumuls(dossier, meta)
+            elif meta['fenetre_sha256'] != _empreinte_plage(f, meta['fenetre'], meta['octets']):
+                meta = None
+        if meta is None:
+            # Reconstruction : on repart d'un dossier vide
+            if os.path.isdir(dossier):
+                for nom in os.listdir(dossier):
+                    os.remove(os.path.join(dossier, nom))
+            os.makedirs(dossier, exist_ok=True)
+            for nom in GRANULARITES:
+                open(os.path.join(dossier, nom + '.bin'), 'wb').close()
+            meta = {'version': CUMULS_VERSION, 'entete': entete.decode('utf-8', 'replace'), 'octets': len(entete),
+                    'series_empreintes': [], 'prochaine_serie': 0, 'lignes_lues': 0, 'doublons': 0, 'manquantes': 0}
+
+        cumuls = _lire_cumuls(dossier, meta)
+        fin = _fin_derniere_ligne(f, meta['octets'], stat.st_size)
+        colonnes = next(csv.reader([entete.decode('utf-8')]))
+        if (fin > meta['octets'] and meta['octets'] == len(entete) and fin == stat.st_size and df is not None
+                and df.attrs.get('signature') == {'taille': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+                and set(colonnes) <= set(df.columns)):
+            lignes = df[colonnes]
+            for debut in range(0, len(lignes), taille_bloc):
+                cumuls.ajouter(lignes.iloc[debut:debut + taille_bloc])
+        elif fin > meta['octets']:
+            lecteur = io.BufferedReader(_Tranche(f, meta['octets'], fin), buffer_size=1 << 20)
+            for bloc in pd.read_csv(lecteur, header=None, names=colonnes, dtype=TYPES_COLONNES,
+                                    chunksize=taille_bloc):
+                cumuls.ajouter(bloc)
+        meta['fenetre'] = max(len(entete), fin - FENETRE_CONTROLE)
+        meta['fenetre_sha256'] = _empreinte_plage(f, meta['fenetre'], fin)
+    meta.update(octets=fin, mtime_ns=stat.st_mtime_ns)
+    return _enregistrer_cumuls(cumuls, dossier, meta)
@@ -3,15 +3,14 @@ import matplotlib.pyplot as plt
 import numpy as np
 import seaborn as sns
 from datetime import datetime
+from donnees_serveur import charger_donnees_serveur, charger_cumuls, moyennes_par
 
 # Charger les données
 print("Chargement des données...")
-df = pd.read_csv("server_usage_data.csv")
-df['Time'] = pd.to_datetime(df['Time'])
-df['Hour'] = df['Time'].dt.hour
-df['Date'] = df['Time'].dt.date
-df['Day_of_week'] = df['Time'].dt.dayofweek
-df['Is_weekend'] = df['Day_of_week'].apply(lambda x: 1 if x >= 5 else 0)
+df = charger_donnees_serveur()
+# Moyennes par heure et semaine/weekend à partir des cumuls horaires et journaliers, sauf si
+# df contient des doublons ou des lignes incomplètes (tous les graphiques portent sur df)
+cumuls = charger_cumuls(df=df)
 
 # Créer un dossier pour les graphiques si nécessaire
 import os
@@ -43,7 +42,7 @@ plt.close()
 print("Graphique de corrélation créé")
 
 # 3. Graphique d'utilisation moyenne par heure
-hourly_avg = df.groupby('Hour').mean(numeric_only=True)
+hourly_avg = moyennes_par(df, cumuls, 'Hour')
 plt.figure(figsize=(12, 6))
 plt.plot(hourly_avg.index, hourly_avg['CPU_Usage'], marker='o', label='CPU Usage (%)')
 plt.plot(hourly_avg.index, hourly_avg['Temperature'], marker='s', label='Temperature (°C)')
@@ -60,7 +59,7 @@ print("Graphique d'utilisation par heure créé")
 
 # 4. Graphique comparatif semaine vs weekend
 plt.figure(figsize=(10, 6))
-weekend_comparison = df.groupby('Is_weekend').mean(numeric_only=True)
+weekend_comparison = moyennes_par(df, cumuls, 'Is_weekend')
 metrics = ['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']
 x = np.arange(len(metrics))
 width = 0.35
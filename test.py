@@ -1,159 +1,477 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+import argparse
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from donnees_serveur import (charger_donnees_serveur, charger_cumuls, ajouter_calendrier, convertir_temps,
+                             dedoublonner, ecrire_index_classement, EmpreintesVues, moyennes_par, top_k,
+                             FICHIER_SERVEUR, METRIQUES, TYPES_COLONNES)
 
-# 1. Charger le CSV
-print("Chargement des données...")
-df_original = pd.read_csv("server_usage_data.csv")
-print(f"Nombre de lignes dans le fichier original: {len(df_original)}")
-
-# 2. Nettoyer les données
-duplicates_count = df_original.duplicated().sum()
-df = df_original.drop_duplicates()
-na_count = df_original.isna().sum().sum() - df.isna().sum().sum()
-df = df.dropna()
-print(f"Nombre de doublons supprimés: {duplicates_count}")
-print(f"Nombre de valeurs manquantes supprimées: {na_count}")
-print(f"Nombre de lignes après nettoyage: {len(df)}")
-
-# 3. Convertir la colonne Time en datetime
-df['Time'] = pd.to_datetime(df['Time'])
-df['Hour'] = df['Time'].dt.hour
-df['Date'] = df['Time'].dt.date
-df['Day_of_week'] = df['Time'].dt.dayofweek
-df['Is_weekend'] = df['Day_of_week'].apply(lambda x: 1 if x >= 5 else 0)
-
-# 4. Analyse statistique de base
-print("\n--- STATISTIQUES DE BASE ---")
-print(df.describe())
-
-# 5. Identifier les pics d'utilisation
-print("\n--- PICS D'UTILISATION ---")
-max_cpu = df.loc[df['CPU_Usage'].idxmax()]
-max_memory = df.loc[df['Memory_Usage'].idxmax()]
-max_network = df.loc[df['Network_Usage'].idxmax()]
-max_temp = df.loc[df['Temperature'].idxmax()]
-
-print(f"Pic d'utilisation CPU: {max_cpu['CPU_Usage']:.2f}% à {max_cpu['Time']}")
-print(f"Pic d'utilisation mémoire: {max_memory['Memory_Usage']:.2f}% à {max_memory['Time']}")
-print(f"Pic d'utilisation réseau: {max_network['Network_Usage']:.2f}% à {max_network['Time']}")
-print(f"Température maximale: {max_temp['Temperature']:.2f}°C à {max_temp['Time']}")
-
-# 6. Analyser les corrélations
-print("\n--- CORRÉLATIONS ---")
-correlation_matrix = df[['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']].corr()
-print(correlation_matrix)
-
-# 7. Trier et sauvegarder les données selon différents critères
-print("\n--- SAUVEGARDE DES DONNÉES TRIÉES ---")
-
-# Par CPU (décroissant)
-df_cpu = df.sort_values(by='CPU_Usage', ascending=False)
-df_cpu.to_csv("serveur_tri_cpu.csv", index=False)
-print("Données triées par CPU sauvegardées dans 'serveur_tri_cpu.csv'")
-print(f"Top 5 des utilisations CPU les plus élevées:")
-print(df_cpu[['Time', 'CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']].head())
-
-# Par température (décroissant)
-df_temp = df.sort_values(by='Temperature', ascending=False)
-df_temp.to_csv("serveur_tri_temperature.csv", index=False)
-print("\nDonnées triées par température sauvegardées dans 'serveur_tri_temperature.csv'")
-print(f"Top 5 des températures les plus élevées:")
-print(df_temp[['Time', 'CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']].head())
-
-# Par charge combinée (CPU + Réseau)
-df['Combined_Load'] = df['CPU_Usage'] * 0.6 + df['Network_Usage'] * 0.4
-df_load = df.sort_values(by='Combined_Load', ascending=False)
-df_load.to_csv("serveur_tri_charge_combinee.csv", index=False)
-print("\nDonnées triées par charge combinée sauvegardées dans 'serveur_tri_charge_combinee.csv'")
-print(f"Top 5 des charges combinées les plus élevées:")
-print(df_load[['Time', 'CPU_Usage', 'Network_Usage', 'Combined_Load', 'Temperature']].head())
-
-# 8. Analyse par heure de la journée
-print("\n--- UTILISATION MOYENNE PAR HEURE ---")
-hourly_avg = df.groupby('Hour').mean(numeric_only=True)
-print(hourly_avg[['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']])
-
-# Identifier les heures de pointe
-peak_hours = hourly_avg['CPU_Usage'].nlargest(3)
-print("\nHeures de pointe (CPU):")
-for hour, value in peak_hours.items():
-    print(f"- {hour}h: {value:.2f}% d'utilisation CPU")
-
-# 9. Analyse par jour de la semaine
-print("\n--- UTILISATION PAR JOUR DE LA SEMAINE ---")
 day_names = {0: 'Lundi', 1: 'Mardi', 2: 'Mercredi', 3: 'Jeudi', 4: 'Vendredi', 5: 'Samedi', 6: 'Dimanche'}
-daily_avg = df.groupby('Day_of_week').mean(numeric_only=True)
-daily_avg['Day_Name'] = [day_names[i] for i in range(7)]
-print(daily_avg[['Day_Name', 'CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']])
-
-# Comparaison semaine vs weekend
-print("\n--- COMPARAISON SEMAINE VS WEEKEND ---")
-weekend_comparison = df.groupby('Is_weekend').mean(numeric_only=True)
-print("Jours de semaine (0) vs Weekend (1):")
-print(weekend_comparison[['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']])
-
-# 10. Créer un rapport de synthèse détaillé
-with open("rapport_analyse_serveur_detaille.txt", "w") as f:
-    f.write("RAPPORT D'ANALYSE DÉTAILLÉE DES DONNÉES SERVEUR\n")
-    f.write("============================================\n\n")
-    
-    f.write("1. STATISTIQUES GÉNÉRALES\n")
-    f.write(f"Période analysée: {df['Time'].min()} à {df['Time'].max()}\n")
-    f.write(f"Nombre total de mesures: {len(df)}\n")
-    f.write(f"Nombre de doublons supprimés: {duplicates_count}\n")
-    f.write(f"Nombre de valeurs manquantes supprimées: {na_count}\n")
-    f.write(f"Utilisation CPU moyenne: {df['CPU_Usage'].mean():.2f}%\n")
-    f.write(f"Utilisation mémoire moyenne: {df['Memory_Usage'].mean():.2f}%\n")
-    f.write(f"Utilisation réseau moyenne: {df['Network_Usage'].mean():.2f}%\n")
-    f.write(f"Température moyenne: {df['Temperature'].mean():.2f}°C\n\n")
-    
-    f.write("2. PICS D'UTILISATION\n")
-    f.write(f"Pic d'utilisation CPU: {max_cpu['CPU_Usage']:.2f}% à {max_cpu['Time']}\n")
-    f.write(f"Pic d'utilisation mémoire: {max_memory['Memory_Usage']:.2f}% à {max_memory['Time']}\n")
-    f.write(f"Pic d'utilisation réseau: {max_network['Network_Usage']:.2f}% à {max_network['Time']}\n")
-    f.write(f"Température maximale: {max_temp['Temperature']:.2f}°C à {max_temp['Time']}\n\n")
-    
-    f.write("3. CORRÉLATIONS\n")
-    f.write(str(correlation_matrix))
-    f.write("\n\n")
-    
-    f.write("4. ANALYSE TEMPORELLE\n")
-    f.write("a) Heures de pointe (CPU):\n")
+
+
+def ecrire_rapport(resume, chemin="rapport_analyse_serveur_detaille.txt"):
+    # Rapport détaillé, commun à l'analyse en mémoire et à l'analyse par blocs
+    correlation_matrix = resume['correlations']
+    weekend_comparison = resume['semaine_weekend']
+    peak_hours = resume['heures_pointe']
+    pics = resume['pics']
+    with open(chemin, "w") as f:
+        f.write("RAPPORT D'ANALYSE DÉTAILLÉE DES DONNÉES SERVEUR\n")
+        f.write("============================================\n\n")
+        
+        f.write("1. STATISTIQUES GÉNÉRALES\n")
+        f.write(f"Période analysée: {resume['debut']} à {resume['fin']}\n")
+        f.write(f"Nombre total de mesures: {resume['mesures']}\n")
+        f.write(f"Nombre de doublons supprimés: {resume['doublons']}\n")
+        f.write(f"Nombre de valeurs manquantes supprimées: {resume['manquantes']}\n")
+        f.write(f"Utilisation CPU moyenne: {resume['moyennes']['CPU_Usage']:.2f}%\n")
+        f.write(f"Utilisation mémoire moyenne: {resume['moyennes']['Memory_Usage']:.2f}%\n")
+        f.write(f"Utilisation réseau moyenne: {resume['moyennes']['Network_Usage']:.2f}%\n")
+        f.write(f"Température moyenne: {resume['moyennes']['Temperature']:.2f}°C\n\n")
+        
+        f.write("2. PICS D'UTILISATION\n")
+        f.write(f"Pic d'utilisation CPU: {pics['CPU_Usage'][0]:.2f}% à {pics['CPU_Usage'][1]}\n")
+        f.write(f"Pic d'utilisation mémoire: {pics['Memory_Usage'][0]:.2f}% à {pics['Memory_Usage'][1]}\n")
+        f.write(f"Pic d'utilisation réseau: {pics['Network_Usage'][0]:.2f}% à {pics['Network_Usage'][1]}\n")
+        f.write(f"Température maximale: {pics['Temperature'][0]:.2f}°C à {pics['Temperature'][1]}\n\n")
+        
+        f.write("3. CORRÉLATIONS\n")
+        f.write(str(correlation_matrix))
+        f.write("\n\n")
+        
+        f.write("4. ANALYSE TEMPORELLE\n")
+        f.write("a) Heures de pointe (CPU):\n")
+        for hour, value in peak_hours.items():
+            f.write(f"   - {hour}h: {value:.2f}% d'utilisation CPU\n")
+        
+        f.write("\nb) Comparaison jours de semaine vs weekend:\n")
+        f.write("   Jours de semaine:\n")
+        f.write(f"   - CPU: {weekend_comparison.loc[0, 'CPU_Usage']:.2f}%\n")
+        f.write(f"   - Température: {weekend_comparison.loc[0, 'Temperature']:.2f}°C\n")
+        f.write("   Weekend:\n")
+        f.write(f"   - CPU: {weekend_comparison.loc[1, 'CPU_Usage']:.2f}%\n")
+        f.write(f"   - Température: {weekend_comparison.loc[1, 'Temperature']:.2f}°C\n\n")
+        
+        f.write("5. RECOMMANDATIONS\n")
+        if pics['CPU_Usage'][0] > 80:
+            f.write("- Attention: Pics d'utilisation CPU élevés, considérer une mise à niveau\n")
+        if pics['Temperature'][0] > 70:
+            f.write("- Attention: Températures élevées détectées, vérifier le système de refroidissement\n")
+        if resume['moyennes']['Memory_Usage'] > 70:
+            f.write("- Attention: Utilisation mémoire moyenne élevée, envisager d'augmenter la RAM\n")
+        
+        # Recommandations basées sur l'analyse temporelle
+        f.write(f"- Planifier les tâches intensives en dehors de {resume['heure_pointe']}h, heure de pointe identifiée\n")
+        
+        # Recommandations basées sur les corrélations
+        if correlation_matrix.loc['Network_Usage', 'Temperature'] > 0.7:
+            f.write("- Optimiser le trafic réseau pour réduire l'échauffement du système\n")
+        
+        f.write("\n6. CONCLUSION\n")
+        f.write("Cette analyse détaillée des données serveur a permis d'identifier:\n")
+        f.write("- Les périodes de charge maximale\n")
+        f.write("- Les corrélations entre les différentes métriques\n")
+        f.write("- Les tendances d'utilisation par heure et par jour\n")
+        f.write("- Des recommandations techniques pour optimiser les performances\n")
+        f.write(f"\nRapport généré le {datetime.now().strftime('%Y-%m-%d à %H:%M:%S')}")
+
+
+# --- Analyse par blocs (hors mémoire) ---
+# Le CSV est lu par blocs de taille fixe et seuls des agrégats fusionnables sont conservés :
+# effectifs, sommes, sommes des carrés, co-moments (corrélations), accumulateurs par heure
+# et par jour, k plus grandes valeurs par critère. Les doublons sont détectés par une
+# empreinte 64 bits de chaque ligne, conservée dans des séries triées (EmpreintesVues) :
+# c'est la seule structure qui grandit avec les données (8 octets par ligne distincte).
+class AgregatsServeur:
+    def __init__(self, k=5):
+        self.k = k
+        m = len(METRIQUES)
+        self.lignes_lues = 0
+        self.empreintes = EmpreintesVues()
+        self.doublons = 0
+        self.manquantes = 0
+        self.n = 0
+        self.moyenne = np.zeros(m)
+        self.comoments = np.zeros((m, m))  # somme des produits des écarts à la moyenne
+        self.minimum = np.full(m, np.inf)
+        self.maximum = np.full(m, -np.inf)
+        self.debut = self.fin = None
+        self.par_heure = (np.zeros(24), np.zeros((24, m)))   # effectifs, sommes
+        self.par_jour = (np.zeros(7), np.zeros((7, m)))
+        self.meilleurs = {}  # critère -> DataFrame des k plus grandes valeurs
+
+    def _dedoublonner(self, bloc):
+        return dedoublonner(self.empreintes, bloc)
+
+    def ajouter(self, bloc):
+        bloc.index = pd.RangeIndex(self.lignes_lues, self.lignes_lues + len(bloc))
+        self.lignes_lues += len(bloc)
+        doublon = self._dedoublonner(bloc)
+        self.doublons += int(doublon.sum())
+        # Même définition que l'analyse en mémoire : valeurs manquantes des lignes dupliquées retirées
+        self.manquantes += int(bloc[doublon].isna().sum().sum())
+        bloc = bloc[~doublon].dropna()
+        if bloc.empty:
+            return
+        bloc = bloc.assign(Time=convertir_temps(bloc['Time']))
+        valeurs = bloc[METRIQUES].to_numpy(dtype=float)
+
+        # Fusion des moyennes et co-moments (formule de Chan et al.)
+        n_b = len(valeurs)
+        moyenne_b = valeurs.mean(axis=0)
+        centre = valeurs - moyenne_b
+        delta = moyenne_b - self.moyenne
+        n = self.n + n_b
+        self.comoments += centre.T @ centre + np.outer(delta, delta) * self.n * n_b / n
+        self.moyenne += delta * n_b / n
+        self.n = n
+        self.minimum = np.minimum(self.minimum, valeurs.min(axis=0))
+        self.maximum = np.maximum(self.maximum, valeurs.max(axis=0))
+        debut, fin = bloc['Time'].min(), bloc['Time'].max()
+        self.debut = debut if self.debut is None else min(self.debut, debut)
+        self.fin = fin if self.fin is None else max(self.fin, fin)
+
+        for (effectifs, sommes), cle in ((self.par_heure, bloc['Time'].dt.hour.to_numpy()),
+                                         (self.par_jour, bloc['Time'].dt.dayofweek.to_numpy())):
+            effectifs += np.bincount(cle, minlength=len(effectifs))
+            for j in range(len(METRIQUES)):
+                sommes[:, j] += np.bincount(cle, weights=valeurs[:, j], minlength=len(effectifs))
+
+        bloc = bloc.assign(Combined_Load=bloc['CPU_Usage'] * 0.6 + bloc['Network_Usage'] * 0.4)
+        for critere in METRIQUES + ['Combined_Load']:
+            # Les candidats des blocs précédents sont placés en premier : à valeur égale,
+            # la première ligne du fichier l'emporte (comme idxmax)
+            candidats = top_k(bloc, critere, self.k)
+            if critere in self.meilleurs:
+                candidats = top_k(pd.concat([self.meilleurs[critere], candidats]), critere, self.k)
+            self.meilleurs[critere] = candidats
+
+    def fusionner(self, autre):
+        # Ajoute les agrégats d'un autre fichier (autre serveur) : les doublons restent
+        # propres à chaque fichier, les empreintes ne sont donc pas fusionnées
+        self.lignes_lues += autre.lignes_lues
+        self.doublons += autre.doublons
+        self.manquantes += autre.manquantes
+        if autre.n:
+            delta = autre.moyenne - self.moyenne
+            n = self.n + autre.n
+            self.comoments += autre.comoments + np.outer(delta, delta) * self.n * autre.n / n
+            self.moyenne += delta * autre.n / n
+            self.n = n
+        self.minimum = np.minimum(self.minimum, autre.minimum)
+        self.maximum = np.maximum(self.maximum, autre.maximum)
+        if autre.debut is not None:
+            self.debut = autre.debut if self.debut is None else min(self.debut, autre.debut)
+            self.fin = autre.fin if self.fin is None else max(self.fin, autre.fin)
+        for accumulateur, autre_accumulateur in ((self.par_heure, autre.par_heure), (self.par_jour, autre.par_jour)):
+            for cumul, autre_cumul in zip(accumulateur, autre_accumulateur):
+                cumul += autre_cumul  # addition en place dans les tableaux
+        for critere, candidats in autre.meilleurs.items():
+            if critere in self.meilleurs:
+                candidats = top_k(pd.concat([self.meilleurs[critere], candidats]), critere, self.k)
+            self.meilleurs[critere] = candidats
+        return self
+
+    def moyennes_par_groupe(self, accumulateur, nom):
+        effectifs, sommes = accumulateur
+        presents = effectifs > 0
+        return pd.DataFrame(sommes[presents] / effectifs[presents][:, None], columns=METRIQUES,
+                            index=pd.Index(np.flatnonzero(presents), name=nom))
+
+    def correlations(self):
+        ecarts = np.sqrt(np.diag(self.comoments))
+        return pd.DataFrame(self.comoments / np.outer(ecarts, ecarts), index=METRIQUES, columns=METRIQUES)
+
+
+def agreger_fichier(chemin, taille_bloc=1_000_000, serveur=None):
+    # Agrégats d'un fichier lu par blocs ; avec serveur, les k premières lignes portent
+    # une colonne Serveur (analyse de flotte)
+    agregats = AgregatsServeur()
+    for bloc in pd.read_csv(chemin, dtype=TYPES_COLONNES, chunksize=taille_bloc):
+        agregats.ajouter(bloc)
+    agregats.empreintes = EmpreintesVues()  # inutiles une fois le fichier lu
+    if serveur is not None:
+        for critere, candidats in agregats.meilleurs.items():
+            agregats.meilleurs[critere] = candidats.assign(Serveur=serveur)
+    return agregats
+
+
+def analyse_par_blocs(chemin=FICHIER_SERVEUR, taille_bloc=1_000_000):
+    print(f"Lecture de '{chemin}' par blocs de {taille_bloc} lignes...")
+    return resume_agregats(agreger_fichier(chemin, taille_bloc))
+
+
+def resume_agregats(agregats):
+    # Affiche l'analyse à partir des agrégats et retourne le résumé attendu par ecrire_rapport
+    print(f"Nombre de lignes dans le fichier original: {agregats.lignes_lues}")
+    print(f"Nombre de doublons supprimés: {agregats.doublons}")
+    print(f"Nombre de valeurs manquantes supprimées: {agregats.manquantes}")
+    print(f"Nombre de lignes après nettoyage: {agregats.n}")
+
+    print("\n--- STATISTIQUES DE BASE ---")
+    ecart_type = np.sqrt(np.diag(agregats.comoments) / (agregats.n - 1))
+    print(pd.DataFrame([np.full(len(METRIQUES), agregats.n), agregats.moyenne, ecart_type,
+                        agregats.minimum, agregats.maximum],
+                       index=['count', 'mean', 'std', 'min', 'max'], columns=METRIQUES))
+    print("(quartiles non calculés en mode par blocs)")
+
+    print("\n--- PICS D'UTILISATION ---")
+    pics = {}
+    for m in METRIQUES:
+        premier = agregats.meilleurs[m].iloc[0]
+        instant = premier['Time'] if 'Serveur' not in premier else f"{premier['Time']} (serveur {premier['Serveur']})"
+        pics[m] = (premier[m], instant)
+    print(f"Pic d'utilisation CPU: {pics['CPU_Usage'][0]:.2f}% à {pics['CPU_Usage'][1]}")
+    print(f"Pic d'utilisation mémoire: {pics['Memory_Usage'][0]:.2f}% à {pics['Memory_Usage'][1]}")
+    print(f"Pic d'utilisation réseau: {pics['Network_Usage'][0]:.2f}% à {pics['Network_Usage'][1]}")
+    print(f"Température maximale: {pics['Temperature'][0]:.2f}°C à {pics['Temperature'][1]}")
+
+    print("\n--- CORRÉLATIONS ---")
+    correlation_matrix = agregats.correlations()
+    print(correlation_matrix)
+
+    print("\n--- PLUS FORTES VALEURS (pas de fichiers triés en mode par blocs) ---")
+    for critere, titre in (('CPU_Usage', 'utilisations CPU'), ('Temperature', 'températures'),
+                           ('Combined_Load', 'charges combinées')):
+        print(f"Top {agregats.k} des {titre} les plus élevées:")
+        colonnes = ['Serveur'] if 'Serveur' in agregats.meilleurs[critere] else []
+        colonnes += ['Time'] + METRIQUES + (['Combined_Load'] if critere == 'Combined_Load' else [])
+        print(agregats.meilleurs[critere][colonnes])
+
+    print("\n--- UTILISATION MOYENNE PAR HEURE ---")
+    hourly_avg = agregats.moyennes_par_groupe(agregats.par_heure, 'Hour')
+    print(hourly_avg)
+    peak_hours = hourly_avg['CPU_Usage'].nlargest(3)
+    print("\nHeures de pointe (CPU):")
+    for hour, value in peak_hours.items():
+        print(f"- {hour}h: {value:.2f}% d'utilisation CPU")
+
+    print("\n--- UTILISATION PAR JOUR DE LA SEMAINE ---")
+    daily_avg = agregats.moyennes_par_groupe(agregats.par_jour, 'Day_of_week')
+    daily_avg.insert(0, 'Day_Name', [day_names[i] for i in daily_avg.index])
+    print(daily_avg)
+
+    print("\n--- COMPARAISON SEMAINE VS WEEKEND ---")
+    effectifs, sommes = agregats.par_jour
+    weekend_comparison = pd.DataFrame(
+        [sommes[:5].sum(axis=0) / effectifs[:5].sum(), sommes[5:].sum(axis=0) / effectifs[5:].sum()],
+        columns=METRIQUES, index=pd.Index([0, 1], name='Is_weekend'))
+    print("Jours de semaine (0) vs Weekend (1):")
+    print(weekend_comparison)
+
+    return {
+        'debut': agregats.debut, 'fin': agregats.fin, 'mesures': agregats.n,
+        'doublons': agregats.doublons, 'manquantes': agregats.manquantes,
+        'moyennes': dict(zip(METRIQUES, agregats.moyenne)), 'pics': pics,
+        'correlations': correlation_matrix, 'heures_pointe': peak_hours,
+        'semaine_weekend': weekend_comparison, 'heure_pointe': hourly_avg['CPU_Usage'].idxmax(),
+    }
+
+
+# --- Analyse de flotte (un CSV par serveur, en parallèle) ---
+# Chaque processus agrège un fichier (lecture par blocs, mémoire bornée) ; les agrégats
+# partiels sont ensuite fusionnés en un résumé de flotte, et chaque serveur reçoit une
+# ligne du tableau de classement.
+COLONNES_CLASSEMENT = ['cpu_moyen', 'cpu_max', 'memoire_moyenne', 'reseau_moyen',
+                       'temperature_moyenne', 'temperature_max']
+
+def fichiers_flotte(source):
+    # Dossier (tous ses .csv) ou motif glob ('logs/srv-*.csv')
+    if os.path.isdir(source):
+        source = os.path.join(source, '*.csv')
+    return sorted(glob.glob(source))
+
+
+def _analyser_serveur(chemin, taille_bloc):
+    # Exécuté dans les processus du pool
+    serveur = os.path.splitext(os.path.basename(chemin))[0]
+    try:
+        return serveur, agreger_fichier(chemin, taille_bloc, serveur), None
+    except Exception as e:
+        return serveur, None, str(e)
+
+
+def ligne_classement(serveur, agregats):
+    moyenne = dict(zip(METRIQUES, agregats.moyenne))
+    maximum = dict(zip(METRIQUES, agregats.maximum))
+    heures = agregats.moyennes_par_groupe(agregats.par_heure, 'Hour')['CPU_Usage']
+    return {
+        'serveur': serveur, 'mesures': agregats.n, 'doublons': agregats.doublons,
+        'debut': agregats.debut, 'fin': agregats.fin,
+        'cpu_moyen': moyenne['CPU_Usage'], 'cpu_max': maximum['CPU_Usage'],
+        'memoire_moyenne': moyenne['Memory_Usage'], 'reseau_moyen': moyenne['Network_Usage'],
+        'temperature_moyenne': moyenne['Temperature'], 'temperature_max': maximum['Temperature'],
+        'heure_pointe': int(heures.idxmax()),
+        'correlation_reseau_temperature': agregats.correlations().loc['Network_Usage', 'Temperature'],
+    }
+
+
+def analyse_flotte(source, workers=None, taille_bloc=1_000_000, classer_par='cpu_moyen',
+                   rapport="rapport_flotte_detaille.txt", classement="classement_serveurs.csv"):
+    fichiers = fichiers_flotte(source)
+    if not fichiers:
+        print(f"ERREUR: aucun fichier CSV trouvé pour '{source}'")
+        return None
+    workers = min(len(fichiers), workers or os.cpu_count() or 1)
+    print(f"Analyse de {len(fichiers)} serveurs avec {workers} processus...")
+
+    debut = time.perf_counter()
+    flotte = AgregatsServeur()
+    lignes = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Résultats dans l'ordre des fichiers : fusion (et ex aequo) déterministes
+        for serveur, agregats, erreur in executor.map(_analyser_serveur, fichiers,
+                                                      [taille_bloc] * len(fichiers)):
+            if erreur is not None or agregats.n == 0:
+                print(f"Erreur lors de l'analyse de {serveur}: {erreur or 'aucune mesure valide'}")
+                continue
+            lignes.append(ligne_classement(serveur, agregats))
+            flotte.fusionner(agregats)
+    print(f"{len(lignes)} serveurs analysés en {time.perf_counter() - debut:.2f} s")
+    if not lignes:
+        return None
+
+    print("\n=== RÉSUMÉ DE LA FLOTTE ===")
+    ecrire_rapport(resume_agregats(flotte), rapport)
+
+    tableau = pd.DataFrame(lignes).sort_values(classer_par, ascending=False, kind='stable')
+    tableau.insert(0, 'rang', range(1, len(tableau) + 1))
+    tableau.to_csv(classement, index=False)
+    print(f"\n--- CLASSEMENT DES SERVEURS (par {classer_par}) ---")
+    print(tableau.head(20).to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+    with open(rapport, "a") as f:
+        f.write(f"\n\nCLASSEMENT DES SERVEURS (par {classer_par}, {len(tableau)} serveurs)\n")
+        f.write(tableau.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+        f.write("\n")
+    print(f"\nRapport de flotte sauvegardé dans '{rapport}', classement dans '{classement}'")
+    return tableau
+
+
+def analyse_en_memoire(chemin=FICHIER_SERVEUR, index_classement=False):
+    # 1. Charger le CSV
+    print("Chargement des données...")
+    df_original = charger_donnees_serveur(chemin, calendrier=False)
+    print(f"Nombre de lignes dans le fichier original: {len(df_original)}")
+
+    # 2. Nettoyer les données
+    duplicates_count = df_original.duplicated().sum()
+    df = df_original.drop_duplicates()
+    na_count = df_original.isna().sum().sum() - df.isna().sum().sum()
+    df = df.dropna()
+    print(f"Nombre de doublons supprimés: {duplicates_count}")
+    print(f"Nombre de valeurs manquantes supprimées: {na_count}")
+    print(f"Nombre de lignes après nettoyage: {len(df)}")
+
+    # 3. Colonnes calendaires (Time est déjà converti en datetime au chargement)
+    df = ajouter_calendrier(df.copy())
+    # Cumuls par heure et par jour (mis à jour avec les seules lignes ajoutées au CSV)
+    cumuls = charger_cumuls(chemin, df_original)
+
+    # 4. Analyse statistique de base
+    print("\n--- STATISTIQUES DE BASE ---")
+    print(df.describe())
+
+    # 5. Identifier les pics d'utilisation
+    print("\n--- PICS D'UTILISATION ---")
+    max_cpu = df.loc[df['CPU_Usage'].idxmax()]
+    max_memory = df.loc[df['Memory_Usage'].idxmax()]
+    max_network = df.loc[df['Network_Usage'].idxmax()]
+    max_temp = df.loc[df['Temperature'].idxmax()]
+
+    print(f"Pic d'utilisation CPU: {max_cpu['CPU_Usage']:.2f}% à {max_cpu['Time']}")
+    print(f"Pic d'utilisation mémoire: {max_memory['Memory_Usage']:.2f}% à {max_memory['Time']}")
+    print(f"Pic d'utilisation réseau: {max_network['Network_Usage']:.2f}% à {max_network['Time']}")
+    print(f"Température maximale: {max_temp['Temperature']:.2f}°C à {max_temp['Time']}")
+
+    # 6. Analyser les corrélations
+    print("\n--- CORRÉLATIONS ---")
+    correlation_matrix = df[['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']].corr()
+    print(correlation_matrix)
+
+    # 7. Classements selon différents critères (sélection des 5 premiers, sans trier les données)
+    print("\n--- CLASSEMENTS ---")
+    df['Combined_Load'] = df['CPU_Usage'] * 0.6 + df['Network_Usage'] * 0.4
+
+    # Par CPU (décroissant)
+    print(f"Top 5 des utilisations CPU les plus élevées:")
+    print(top_k(df, 'CPU_Usage')[['Time', 'CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']])
+
+    # Par température (décroissant)
+    print(f"\nTop 5 des températures les plus élevées:")
+    print(top_k(df, 'Temperature')[['Time', 'CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']])
+
+    # Par charge combinée (CPU + Réseau)
+    print(f"\nTop 5 des charges combinées les plus élevées:")
+    print(top_k(df, 'Combined_Load')[['Time', 'CPU_Usage', 'Network_Usage', 'Combined_Load', 'Temperature']])
+
+    # Index de classement sur disque (positions des lignes du CSV), à la place de copies triées du CSV
+    if index_classement:
+        for critere in ('CPU_Usage', 'Temperature', 'Combined_Load'):
+            print(f"Index de classement par {critere} sauvegardé dans '{ecrire_index_classement(df, critere, chemin)}'")
+
+    # 8. Analyse par heure de la journée
+    print("\n--- UTILISATION MOYENNE PAR HEURE ---")
+    hourly_avg = moyennes_par(df, cumuls, 'Hour')
+    print(hourly_avg[['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']])
+
+    # Identifier les heures de pointe
+    peak_hours = hourly_avg['CPU_Usage'].nlargest(3)
+    print("\nHeures de pointe (CPU):")
     for hour, value in peak_hours.items():
-        f.write(f"   - {hour}h: {value:.2f}% d'utilisation CPU\n")
-    
-    f.write("\nb) Comparaison jours de semaine vs weekend:\n")
-    f.write("   Jours de semaine:\n")
-    f.write(f"   - CPU: {weekend_comparison.loc[0, 'CPU_Usage']:.2f}%\n")
-    f.write(f"   - Température: {weekend_comparison.loc[0, 'Temperature']:.2f}°C\n")
-    f.write("   Weekend:\n")
-    f.write(f"   - CPU: {weekend_comparison.loc[1, 'CPU_Usage']:.2f}%\n")
-    f.write(f"   - Température: {weekend_comparison.loc[1, 'Temperature']:.2f}°C\n\n")
-    
-    f.write("5. RECOMMANDATIONS\n")
-    if df['CPU_Usage'].max() > 80:
-        f.write("- Attention: Pics d'utilisation CPU élevés, considérer une mise à niveau\n")
-    if df['Temperature'].max() > 70:
-        f.write("- Attention: Températures élevées détectées, vérifier le système de refroidissement\n")
-    if df['Memory_Usage'].mean() > 70:
-        f.write("- Attention: Utilisation mémoire moyenne élevée, envisager d'augmenter la RAM\n")
-    
-    # Recommandations basées sur l'analyse temporelle
-    peak_hour = hourly_avg['CPU_Usage'].idxmax()
-    f.write(f"- Planifier les tâches intensives en dehors de {peak_hour}h, heure de pointe identifiée\n")
-    
-    # Recommandations basées sur les corrélations
-    if correlation_matrix.loc['Network_Usage', 'Temperature'] > 0.7:
-        f.write("- Optimiser le trafic réseau pour réduire l'échauffement du système\n")
-    
-    f.write("\n6. CONCLUSION\n")
-    f.write("Cette analyse détaillée des données serveur a permis d'identifier:\n")
-    f.write("- Les périodes de charge maximale\n")
-    f.write("- Les corrélations entre les différentes métriques\n")
-    f.write("- Les tendances d'utilisation par heure et par jour\n")
-    f.write("- Des recommandations techniques pour optimiser les performances\n")
-    f.write(f"\nRapport généré le {datetime.now().strftime('%Y-%m-%d à %H:%M:%S')}")
-
-print("\nAnalyse détaillée terminée! Rapport sauvegardé dans 'rapport_analyse_serveur_detaille.txt'")
\ No newline at end of file
+        print(f"- {hour}h: {value:.2f}% d'utilisation CPU")
+
+    # 9. Analyse par jour de la semaine
+    print("\n--- UTILISATION PAR JOUR DE LA SEMAINE ---")
+    daily_avg = moyennes_par(df, cumuls, 'Day_of_week')
+    daily_avg['Day_Name'] = [day_names[i] for i in range(7)]
+    print(daily_avg[['Day_Name', 'CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']])
+
+    # Comparaison semaine vs weekend
+    print("\n--- COMPARAISON SEMAINE VS WEEKEND ---")
+    weekend_comparison = moyennes_par(df, cumuls, 'Is_weekend')
+    print("Jours de semaine (0) vs Weekend (1):")
+    print(weekend_comparison[['CPU_Usage', 'Memory_Usage', 'Network_Usage', 'Temperature']])
+
+    # 10. Créer un rapport de synthèse détaillé
+    ecrire_rapport({
+        'debut': df['Time'].min(), 'fin': df['Time'].max(), 'mesures': len(df),
+        'doublons': duplicates_count, 'manquantes': na_count,
+        'moyennes': {m: df[m].mean() for m in METRIQUES},
+        'pics': {m: (ligne[m], ligne['Time']) for m, ligne in
+                 zip(METRIQUES, (max_cpu, max_memory, max_network, max_temp))},
+        'correlations': correlation_matrix, 'heures_pointe': peak_hours,
+        'semaine_weekend': weekend_comparison, 'heure_pointe': hourly_avg['CPU_Usage'].idxmax(),
+    })
+
+    print("\nAnalyse détaillée terminée! Rapport sauvegardé dans 'rapport_analyse_serveur_detaille.txt'")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analyse détaillée des données serveur")
+    parser.add_argument('--blocs', type=int, metavar='LIGNES',
+                        help="analyse par blocs de LIGNES lignes (mémoire bornée, pour les gros fichiers)")
+    parser.add_argument('--fichier', default=FICHIER_SERVEUR)
+    parser.add_argument('--index-classement', action='store_true',
+                        help="sauvegarde des index de classement (CPU, température, charge combinée) dans .cache/")
+    parser.add_argument('--flotte', metavar='DOSSIER_OU_MOTIF',
+                        help="analyse de flotte : un CSV par serveur (dossier ou motif glob)")
+    parser.add_argument('--workers', type=int, help="nombre de processus pour --flotte (défaut: nombre de cœurs)")
+    parser.add_argument('--classer-par', default='cpu_moyen', choices=COLONNES_CLASSEMENT,
+                        help="critère du classement des serveurs")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.flotte:
+        analyse_flotte(args.flotte, args.workers, args.blocs or 1_000_000, args.classer_par)
+    elif args.blocs:
+        ecrire_rapport(analyse_par_blocs(args.fichier, args.blocs))
+        print("\nAnalyse détaillée terminée! Rapport sauvegardé dans 'rapport_analyse_serveur_detaille.txt'")
+    else:
+        analyse_en_memoire(args.fichier, args.index_classement)
@@ -1,12 +1,25 @@
 import os
+import json
 import time
+import tempfile
+import argparse
+from datetime import datetime
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import re
+from benchmark_harness import (run_benchmark, environment_metadata, save_results_json, save_results_csv,
+                               file_hash, code_version, store_key, load_store, append_to_store,
+                               fit_scaling, detect_regressions)
 
 # Chemin vers le dossier contenant les fichiers de données
 DATA_DIR = "GreenIT_data"
+# Dossier du cache binaire (.npy) des fichiers de données
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+# Stockage incrémental (JSONL en ajout seul) de toutes les mesures du balayage
+STORE_PATH = "resultats_two_sum_store.jsonl"
 
 def extract_number(filename):
     """Extrait le nombre du nom de fichier data_list_X.csv"""
@@ -15,16 +28,73 @@ def extract_number(filename):
         return int(match.group(1))
     return 0
 
-def load_data(file_path):
-    """Charge les données depuis un fichier CSV"""
+def _cache_paths(file_path):
+    """Chemins du fichier .npy et de ses métadonnées pour un fichier CSV donné"""
+    base_name = os.path.splitext(os.path.basename(file_path))[0]
+    return (os.path.join(CACHE_DIR, base_name + ".npy"),
+            os.path.join(CACHE_DIR, base_name + ".json"))
+
+def _read_cached_array(cache_path, meta_path, signature):
+    """
+    Tableau en cache (mémoire mappée) si ses métadonnées correspondent à signature, sinon None
+    Des métadonnées illisibles (fichier tronqué, JSON invalide) comptent comme une absence
+    de cache : le CSV est alors relu et le cache reconstruit
+    """
     try:
+        with open(meta_path, encoding='utf-8') as f:
+            if json.load(f) != signature:
+                return None
+        return np.load(cache_path, mmap_mode='r')
+    except (OSError, ValueError, EOFError):
+        return None
+
+def _write_cached_array(values, cache_path, meta_path, signature):
+    """Écrit le tableau puis ses métadonnées, chacun via un fichier temporaire renommé"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = cache_path + ".tmp.npy"
+    np.save(tmp_path, values)
+    os.replace(tmp_path, cache_path)
+    tmp_meta = meta_path + ".tmp"
+    with open(tmp_meta, 'w', encoding='utf-8') as f:
+        json.dump(signature, f)
+    os.replace(tmp_meta, meta_path)
+
+def load_data_array(file_path, use_cache=True):
+    """
+    Charge les données sous forme de ndarray int64
+    Le CSV n'est analysé qu'une fois : le résultat est stocké dans un fichier .npy
+    réutilisé tant que la taille et la date de modification du CSV sont inchangées.
+    Le cache est ouvert en mémoire mappée (lecture seule, sans copie).
+    Retourne (tableau, cache_utilise)
+    """
+    cache_path, meta_path = _cache_paths(file_path)
+    try:
+        stat = os.stat(file_path)
+        signature = {'taille': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        if use_cache:
+            values = _read_cached_array(cache_path, meta_path, signature)
+            if values is not None:
+                return values, True
+
         # Ajouter header=0 pour traiter la première ligne comme en-tête
-        df = pd.read_csv(file_path, header=0)
-        # Convertir en liste d'entiers
-        return df["Value"].astype(int).tolist()  # Utiliser le nom de colonne "Value"
-    except Exception as e:
+        df = pd.read_csv(file_path, header=0, usecols=["Value"], dtype={"Value": np.int64})
+        values = df["Value"].to_numpy()
+    except (OSError, ValueError) as e:
+        # Fichier absent ou illisible, CSV mal formé (ParserError et EmptyDataError sont des ValueError)
         print(f"Erreur lors du chargement de {file_path}: {e}")
-        return []
+        return np.empty(0, dtype=np.int64), False
+
+    if use_cache:
+        try:
+            _write_cached_array(values, cache_path, meta_path, signature)
+        except OSError as e:
+            print(f"Cache non écrit pour {file_path}: {e}")
+    return values, False
+
+def load_data(file_path):
+    """Charge les données depuis un fichier CSV (via le cache binaire) sous forme de liste d'entiers"""
+    values, _ = load_data_array(file_path)
+    return values.tolist()
 
 # Implémentation des trois algorithmes pour résoudre le problème Two Sum
 
@@ -75,12 +145,341 @@ def two_sum_hash_table(nums, target=0):
         num_map[num] = i
     return None
 
-def measure_execution_time(algorithm, data, target=0):
-    """Mesure le temps d'exécution d'un algorithme"""
-    start_time = time.perf_counter()
-    result = algorithm(data, target)
-    end_time = time.perf_counter()
-    return end_time - start_time
+# Implémentations vectorisées avec NumPy (travaillent sur des ndarrays)
+
+# Taille des tuiles pour la force brute par blocs : 256 x 256 entiers int64
+# représentent 512 Ko, ce qui tient dans le cache L2 de la plupart des CPU
+NUMPY_BLOCK_SIZE = 256
+
+def two_sum_numpy_sorting(nums, target=0):
+    """
+    NumPy argsort + deux pointeurs - O(n log n)
+    Le tri est fait en C par np.argsort, seul le parcours des pointeurs reste en Python
+    """
+    values = np.asarray(nums, dtype=np.int64)
+    order = np.argsort(values, kind='stable')
+    # Parcourir des entiers Python est plus rapide que des scalaires NumPy
+    sorted_values = values[order].tolist()
+
+    left, right = 0, len(sorted_values) - 1
+    while left < right:
+        current_sum = sorted_values[left] + sorted_values[right]
+        if current_sum == target:
+            return sorted([int(order[left]), int(order[right])])
+        elif current_sum < target:
+            left += 1
+        else:
+            right -= 1
+    return None
+
+def two_sum_numpy_searchsorted(nums, target=0):
+    """
+    NumPy argsort + np.searchsorted - O(n log n), entièrement vectorisé
+    Cherche le complément de chaque valeur dans le tableau trié en une seule passe
+    """
+    values = np.asarray(nums, dtype=np.int64)
+    n = len(values)
+    if n < 2:
+        return None
+    order = np.argsort(values, kind='stable')
+    sorted_values = values[order]
+    complements = target - sorted_values
+    positions = np.searchsorted(sorted_values, complements, side='left')
+    # Si le complément trouvé est l'élément lui-même, on prend son voisin de droite
+    positions = np.where(positions == np.arange(n), positions + 1, positions)
+    in_bounds = positions < n
+    found = np.zeros(n, dtype=bool)
+    found[in_bounds] = sorted_values[positions[in_bounds]] == complements[in_bounds]
+    hits = np.flatnonzero(found)
+    if len(hits) == 0:
+        return None
+    i = hits[0]
+    return sorted([int(order[i]), int(order[positions[i]])])
+
+def _scan_row_block(values, start_i, target, block_size):
+    """
+    Compare la ligne de blocs commençant à start_i avec toutes les tuiles à sa droite
+    Retourne la première paire [i, j] trouvée ou None
+    """
+    n = len(values)
+    block_i = values[start_i:start_i + block_size, None]
+    for start_j in range(start_i, n, block_size):
+        matches = (block_i + values[None, start_j:start_j + block_size]) == target
+        if start_j == start_i:
+            # Dans la tuile diagonale, ne garder que les paires j > i
+            matches = np.triu(matches, k=1)
+        if matches.any():
+            i, j = np.argwhere(matches)[0]
+            return [start_i + int(i), start_j + int(j)]
+    return None
+
+def two_sum_numpy_blocked(nums, target=0, block_size=NUMPY_BLOCK_SIZE):
+    """
+    Force brute NumPy par tuiles - O(n²)
+    Compare toutes les paires par blocs de taille block_size x block_size
+    (broadcast) afin que chaque tuile reste dans le cache
+    """
+    values = np.asarray(nums, dtype=np.int64)
+    for start_i in range(0, len(values), block_size):
+        pair = _scan_row_block(values, start_i, target, block_size)
+        if pair is not None:
+            return pair
+    return None
+
+# Mode flux : le fichier est lu par morceaux, sans jamais charger toute la liste en mémoire
+
+# Taille maximale (en bits) du bitset des valeurs déjà vues : 2³² bits = 512 Mo
+MAX_BITSET_BITS = 1 << 32
+
+def iter_value_chunks(file_path, chunk_size=1_000_000):
+    """Lit la colonne Value d'un fichier data_list_N.csv par morceaux de chunk_size lignes (int64)"""
+    for chunk in pd.read_csv(file_path, header=0, usecols=["Value"], dtype={"Value": np.int64},
+                             chunksize=chunk_size):
+        yield chunk["Value"].to_numpy()
+
+def _find_first_index(file_path, value, chunk_size):
+    """Relit le fichier jusqu'à la première occurrence de value et retourne son indice"""
+    row = 0
+    for chunk in iter_value_chunks(file_path, chunk_size):
+        hits = np.flatnonzero(chunk == value)
+        if len(hits):
+            return row + int(hits[0])
+        row += len(chunk)
+    return None
+
+def _two_sum_bitset(file_path, target, chunk_size, vmin, vmax):
+    """
+    Flux avec un bitset des valeurs déjà vues sur le domaine [vmin, vmax]
+    Mémoire : (vmax - vmin) / 8 octets + un morceau
+    """
+    bits = np.zeros((vmax - vmin) // 8 + 1, dtype=np.uint8)
+    row = 0
+    for chunk in iter_value_chunks(file_path, chunk_size):
+        # 1. Le complément a-t-il été vu dans un morceau précédent ?
+        complements = target - chunk
+        in_domain = np.flatnonzero((complements >= vmin) & (complements <= vmax))
+        offsets = complements[in_domain] - vmin
+        seen = (bits[offsets >> 3] >> (offsets & 7).astype(np.uint8)) & 1
+        hits = in_domain[seen.astype(bool)]
+        if len(hits):
+            j = row + int(hits[0])
+            i = _find_first_index(file_path, int(complements[hits[0]]), chunk_size)
+            return sorted([i, j])
+        # 2. Paire à l'intérieur du morceau
+        pair = two_sum_numpy_searchsorted(chunk, target)
+        if pair is not None:
+            return [row + pair[0], row + pair[1]]
+        # 3. Marquer les valeurs du morceau comme vues
+        offsets = np.unique(chunk - vmin)
+        np.bitwise_or.at(bits, offsets >> 3, (1 << (offsets & 7)).astype(np.uint8))
+        row += len(chunk)
+    return None
+
+def _merge_sorted_runs(run_a, run_b, out_prefix, block_size):
+    """
+    Fusionne deux séquences triées sur disque (valeurs, indices) par blocs de block_size
+    A chaque étape, tout ce qui est <= au plus petit des deux derniers éléments des blocs
+    courants peut être écrit : au moins un bloc entier est consommé par étape
+    """
+    (values_a, index_a), (values_b, index_b) = run_a, run_b
+    total = len(values_a) + len(values_b)
+    out_values = np.lib.format.open_memmap(out_prefix + "_v.npy", mode='w+', dtype=np.int64, shape=(total,))
+    out_index = np.lib.format.open_memmap(out_prefix + "_i.npy", mode='w+', dtype=np.int64, shape=(total,))
+    pos_a = pos_b = pos_out = 0
+    while pos_a < len(values_a) or pos_b < len(values_b):
+        block_a = values_a[pos_a:pos_a + block_size]
+        block_b = values_b[pos_b:pos_b + block_size]
+        if len(block_a) == 0 or len(block_b) == 0:
+            take_a, take_b = len(block_a), len(block_b)
+        else:
+            limit = min(block_a[-1], block_b[-1])
+            take_a = int(np.searchsorted(block_a, limit, side='right'))
+            take_b = int(np.searchsorted(block_b, limit, side='right'))
+        merged_values = np.concatenate([block_a[:take_a], block_b[:take_b]])
+        merged_index = np.concatenate([index_a[pos_a:pos_a + take_a], index_b[pos_b:pos_b + take_b]])
+        order = np.argsort(merged_values, kind='stable')
+        out_values[pos_out:pos_out + len(order)] = merged_values[order]
+        out_index[pos_out:pos_out + len(order)] = merged_index[order]
+        pos_a += take_a
+        pos_b += take_b
+        pos_out += len(order)
+    out_values.flush()
+    out_index.flush()
+    return (np.load(out_prefix + "_v.npy", mmap_mode='r'), np.load(out_prefix + "_i.npy", mmap_mode='r'))
+
+def _two_sum_external_sort(file_path, target, chunk_size, tmp_dir=None):
+    """
+    Flux par tri externe : morceaux triés écrits sur disque, fusionnés deux à deux,
+    puis recherche vectorisée des compléments (np.searchsorted) dans le fichier
+    trié ouvert en mémoire mappée. Mémoire : quelques morceaux
+    """
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as work_dir:
+        runs = []
+        row = 0
+        for k, chunk in enumerate(iter_value_chunks(file_path, chunk_size)):
+            order = np.argsort(chunk, kind='stable')
+            prefix = os.path.join(work_dir, f"run_0_{k}")
+            np.save(prefix + "_v.npy", chunk[order])
+            np.save(prefix + "_i.npy", row + order)
+            runs.append((np.load(prefix + "_v.npy", mmap_mode='r'), np.load(prefix + "_i.npy", mmap_mode='r')))
+            row += len(chunk)
+        if row < 2:
+            return None
+
+        merge_pass = 0
+        while len(runs) > 1:
+            merge_pass += 1
+            merged = []
+            for k in range(0, len(runs) - 1, 2):
+                prefix = os.path.join(work_dir, f"run_{merge_pass}_{k}")
+                merged.append(_merge_sorted_runs(runs[k], runs[k + 1], prefix, chunk_size))
+            if len(runs) % 2:
+                merged.append(runs[-1])
+            runs = merged
+
+        sorted_values, sorted_index = runs[0]
+        n = len(sorted_values)
+        for start in range(0, n, chunk_size):
+            block = np.asarray(sorted_values[start:start + chunk_size])
+            complements = target - block
+            positions = np.searchsorted(sorted_values, complements, side='left')
+            # Si le complément trouvé est l'élément lui-même, on prend son voisin de droite
+            positions = np.where(positions == np.arange(start, start + len(block)), positions + 1, positions)
+            in_bounds = np.flatnonzero(positions < n)
+            found = in_bounds[sorted_values[positions[in_bounds]] == complements[in_bounds]]
+            if len(found):
+                h = found[0]
+                return sorted([int(sorted_index[start + h]), int(sorted_index[positions[h]])])
+        return None
+
+def two_sum_streaming(file_path, target=0, chunk_size=1_000_000, max_bitset_bits=MAX_BITSET_BITS, tmp_dir=None):
+    """
+    Two Sum en flux sur un fichier data_list_N.csv - O(n), mémoire bornée
+    Une première passe calcule le domaine des valeurs. S'il tient dans max_bitset_bits,
+    un bitset des valeurs vues remplace la table de hachage ; sinon on passe par un
+    tri externe sur disque (dans tmp_dir).
+    """
+    vmin = vmax = None
+    for chunk in iter_value_chunks(file_path, chunk_size):
+        if len(chunk):
+            vmin = int(chunk.min()) if vmin is None else min(vmin, int(chunk.min()))
+            vmax = int(chunk.max()) if vmax is None else max(vmax, int(chunk.max()))
+    if vmin is None:
+        return None
+    if vmax - vmin + 1 <= max_bitset_bits:
+        return _two_sum_bitset(file_path, target, chunk_size, vmin, vmax)
+    return _two_sum_external_sort(file_path, target, chunk_size, tmp_dir)
+
+def available_cpu_count():
+    """Nombre de coeurs utilisables par le processus courant (respecte l'épinglage)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+# Force brute parallèle : chaque processus reçoit les données une seule fois
+# (initializer) ainsi qu'un Event partagé qui signale qu'une paire a été trouvée
+_worker_values = None
+_worker_stop_event = None
+
+def _init_brute_force_worker(values, stop_event):
+    """Initialise l'état partagé d'un processus de la force brute parallèle"""
+    global _worker_values, _worker_stop_event
+    _worker_values = values
+    _worker_stop_event = stop_event
+
+def _brute_force_row_blocks(row_starts, target, block_size):
+    """Parcourt les lignes de blocs attribuées à un processus, avec arrêt anticipé"""
+    for start_i in row_starts:
+        # Un autre processus a trouvé une paire (ou le budget de temps est dépassé)
+        if _worker_stop_event.is_set():
+            return None
+        pair = _scan_row_block(_worker_values, start_i, target, block_size)
+        if pair is not None:
+            _worker_stop_event.set()
+            return pair
+    return None
+
+class BruteForcePool:
+    """
+    Processus de la force brute parallèle pour un tableau donné : les données sont envoyées
+    une seule fois et les processus sont réutilisés d'un appel à l'autre (les répétitions
+    d'un benchmark ne mesurent alors que le parcours, pas le démarrage des processus)
+    """
+    def __init__(self, values, workers=None):
+        self.values = values
+        self.workers = workers or available_cpu_count()
+        self.stop_event = multiprocessing.Event()
+        self.executor = None
+        if self.workers > 1:  # un seul coeur : parcours séquentiel, sans processus
+            self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                initializer=_init_brute_force_worker,
+                                                initargs=(values, self.stop_event))
+
+    def close(self):
+        self.stop_event.set()
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def two_sum_brute_force_parallel(nums, target=0, workers=None, block_size=NUMPY_BLOCK_SIZE, time_budget=None,
+                                 pool=None):
+    """
+    Force brute parallèle par tuiles - O(n²) répartie sur tous les coeurs
+    Les lignes de blocs sont distribuées en tourniquet pour équilibrer la charge
+    triangulaire. Lève TimeoutError si time_budget (secondes) est dépassé.
+    pool : BruteForcePool créé pour nums, réutilisé au lieu de démarrer de nouveaux processus
+    """
+    values = np.asarray(nums, dtype=np.int64) if pool is None else pool.values
+    workers = pool.workers if pool is not None else workers or available_cpu_count()
+    row_starts = list(range(0, len(values), block_size))
+    if workers == 1 or len(row_starts) <= 1:
+        if time_budget is None:
+            return two_sum_numpy_blocked(values, target, block_size)
+        deadline = time.perf_counter() + time_budget
+        for start_i in row_starts:
+            if time.perf_counter() > deadline:
+                raise TimeoutError(f"Budget de {time_budget} s dépassé")
+            pair = _scan_row_block(values, start_i, target, block_size)
+            if pair is not None:
+                return pair
+        return None
+
+    own_pool = pool is None
+    if own_pool:
+        pool = BruteForcePool(values, workers)
+    # Plusieurs tâches par processus pour lisser les écarts de charge
+    num_tasks = min(len(row_starts), workers * 4)
+    pool.stop_event.clear()
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    futures = [pool.executor.submit(_brute_force_row_blocks, row_starts[k::num_tasks], target, block_size)
+               for k in range(num_tasks)]
+    try:
+        pending = set(futures)
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError(f"Budget de {time_budget} s dépassé")
+            for future in done:
+                pair = future.result()
+                if pair is not None:
+                    return pair
+        return None
+    finally:
+        # Arrêter les tâches restantes dès la fin de leur ligne de blocs courante : le
+        # pool est libre (et l'Event peut être réarmé) pour l'appel suivant
+        pool.stop_event.set()
+        for future in futures:
+            future.cancel()
+        wait(futures)
+        if own_pool:
+            pool.close()
 
 def estimate_brute_force_time(data_size, reference_size, reference_time):
     """
@@ -92,119 +491,568 @@ def estimate_brute_force_time(data_size, reference_size, reference_time):
     # Formule quadratique: temps ~ (taille²/référence_taille²) * référence_temps
     return (data_size**2 / reference_size**2) * reference_time
 
-def main():
+# Index multi-cibles : construit une fois, il répond à de nombreuses cibles sur la même liste
+
+class TwoSumIndex:
+    """
+    Index Two Sum réutilisable sur une liste fixe
+
+    Les valeurs sont triées une seule fois (argsort) puis regroupées en u valeurs distinctes.
+    Si u est petit (u² / 2 <= max_pair_sums, le cas des fichiers GreenIT où u ~ 340),
+    toutes les sommes de paires de valeurs distinctes sont précalculées et triées :
+    une requête coûte alors O(log u²), indépendamment de n. Sinon chaque requête
+    cherche ses compléments parmi les valeurs distinctes en O(u log u), par lots vectorisés.
+    """
+
+    def __init__(self, nums, max_pair_sums=4_000_000):
+        values = np.asarray(nums, dtype=np.int64)
+        self.size = len(values)
+        self.order = np.argsort(values, kind='stable')
+        sorted_values = values[self.order]
+        # Valeurs distinctes, première position dans l'ordre trié et nombre d'occurrences
+        self.unique_values, self.first_positions, self.counts = np.unique(
+            sorted_values, return_index=True, return_counts=True)
+        u = len(self.unique_values)
+        self.pair_sums = None
+        if u * (u + 1) // 2 <= max_pair_sums:
+            left, right = np.triu_indices(u)
+            # Une valeur ne peut être associée à elle-même que si elle apparaît au moins deux fois
+            valid = (left != right) | (self.counts[left] >= 2)
+            left, right = left[valid], right[valid]
+            sums = self.unique_values[left] + self.unique_values[right]
+            sum_order = np.argsort(sums, kind='stable')
+            self.pair_sums = sums[sum_order]
+            self.pair_left = left[sum_order]
+            self.pair_right = right[sum_order]
+
+    def _pairs_to_indices(self, left, right):
+        """Convertit des couples de valeurs distinctes en indices dans la liste d'origine"""
+        i = self.order[self.first_positions[left]]
+        # Même valeur des deux côtés : on prend sa deuxième occurrence
+        j = self.order[self.first_positions[right] + (left == right)]
+        return np.sort(np.stack([i, j], axis=1), axis=1)
+
+    def query_batch(self, targets, chunk_size=1_000_000):
+        """
+        Répond à un lot de cibles en une passe vectorisée
+        Retourne un tableau (k, 2) d'indices, avec -1 pour les cibles sans solution
+        """
+        targets = np.asarray(targets, dtype=np.int64)
+        result = np.full((len(targets), 2), -1, dtype=np.int64)
+        if self.size < 2 or len(targets) == 0:
+            return result
+
+        if self.pair_sums is not None:
+            positions = np.searchsorted(self.pair_sums, targets)
+            positions = np.minimum(positions, len(self.pair_sums) - 1)
+            found = self.pair_sums[positions] == targets
+            hits = positions[found]
+            result[found] = self._pairs_to_indices(self.pair_left[hits], self.pair_right[hits])
+            return result
+
+        # Trop de valeurs distinctes : compléments cherchés par lots de cibles (mémoire bornée)
+        u = len(self.unique_values)
+        batch = max(1, chunk_size // u)
+        for start in range(0, len(targets), batch):
+            chunk = targets[start:start + batch]
+            complements = chunk[:, None] - self.unique_values[None, :]
+            positions = np.minimum(np.searchsorted(self.unique_values, complements), u - 1)
+            same = positions == np.arange(u)[None, :]
+            matches = (self.unique_values[positions] == complements) & (~same | (self.counts >= 2)[None, :])
+            rows = np.flatnonzero(matches.any(axis=1))
+            left = matches[rows].argmax(axis=1)
+            result[start + rows] = self._pairs_to_indices(left, positions[rows, left])
+        return result
+
+    def query(self, target):
+        """Répond à une seule cible : [i, j] ou None, comme les autres algorithmes"""
+        i, j = self.query_batch([target])[0]
+        return None if i < 0 else [int(i), int(j)]
+
+def make_query_targets(values, count, seed=0):
+    """Cibles de test : moitié sommes de paires existantes, moitié valeurs aléatoires"""
+    rng = np.random.default_rng(seed)
+    values = np.asarray(values, dtype=np.int64)
+    existing = values[rng.integers(0, len(values), count)] + values[rng.integers(0, len(values), count)]
+    random_targets = rng.integers(values.min() * 2, values.max() * 2 + 1, count)
+    return np.where(rng.random(count) < 0.5, existing, random_targets)
+
+def benchmark_index(files, query_count, max_time=10):
+    """
+    Mesure l'index multi-cibles pour chaque taille : temps de construction et
+    débit de requêtes (par lots de query_count cibles), en requêtes par seconde
+    """
+    records = []
+    for file_path, data_size in files:
+        values, _ = load_data_array(file_path)
+        if len(values) < 2:
+            continue
+        targets = make_query_targets(values, query_count)
+        start_time = time.perf_counter()
+        index = TwoSumIndex(values)
+        build_time = time.perf_counter() - start_time
+        record = {'algorithme': 'index_multi_cibles', 'taille_donnees': data_size, 'estime': False}
+        record.update(run_benchmark(index.query_batch, targets, max_time=max_time))
+        # Temps par requête (comparable aux autres mesures) et débit du lot
+        record['requetes_par_lot'] = query_count
+        record['requetes_par_seconde'] = query_count / record['mediane']
+        record['temps_construction'] = build_time
+        for stat in ('mediane', 'q1', 'q3', 'min', 'max', 'moyenne'):
+            record[stat] /= query_count
+        print(f"  Index multi-cibles (taille {data_size}): construction {build_time:.3e} s, "
+              f"{record['requetes_par_seconde']:.3e} requêtes/s")
+        records.append(record)
+    return records
+
+# Algorithmes comparés : 'donnees' indique si l'algorithme reçoit la liste Python,
+# le ndarray NumPy ou le chemin du fichier (mode flux), 'taille_max' la taille
+# au-delà de laquelle il n'est pas mesuré
+ALGORITHMS = [
+    {'nom': 'brute', 'fonction': two_sum_brute_force, 'donnees': 'liste', 'taille_max': 10000,
+     'label': 'Force brute O(n²)', 'style': 'o-', 'couleur': 'red'},
+    {'nom': 'brute_parallele', 'fonction': two_sum_brute_force_parallel, 'donnees': 'numpy', 'taille_max': None,
+     'label': 'Force brute parallèle O(n²)', 'style': 'o-', 'couleur': 'darkred'},
+    {'nom': 'tri_pointeurs', 'fonction': two_sum_sorting, 'donnees': 'liste', 'taille_max': None,
+     'label': 'Tri + pointeurs O(n log n)', 'style': 'o-', 'couleur': 'blue'},
+    {'nom': 'hachage', 'fonction': two_sum_hash_table, 'donnees': 'liste', 'taille_max': None,
+     'label': 'Table de hachage O(n)', 'style': 'o-', 'couleur': 'green'},
+    {'nom': 'numpy_tri_pointeurs', 'fonction': two_sum_numpy_sorting, 'donnees': 'numpy', 'taille_max': None,
+     'label': 'NumPy argsort + pointeurs O(n log n)', 'style': 's--', 'couleur': 'purple'},
+    {'nom': 'numpy_searchsorted', 'fonction': two_sum_numpy_searchsorted, 'donnees': 'numpy', 'taille_max': None,
+     'label': 'NumPy searchsorted O(n log n)', 'style': 's--', 'couleur': 'cyan'},
+    {'nom': 'numpy_brute_blocs', 'fonction': two_sum_numpy_blocked, 'donnees': 'numpy', 'taille_max': 100000,
+     'label': 'Force brute NumPy par blocs O(n²)', 'style': 's--', 'couleur': 'orange'},
+    {'nom': 'flux', 'fonction': two_sum_streaming, 'donnees': 'fichier', 'taille_max': None,
+     'label': 'Flux par morceaux, mémoire bornée O(n)', 'style': 'd-.', 'couleur': 'brown'},
+]
+
+# Ordonnancement du balayage : une tâche = (taille, algorithme, répétition)
+
+def _find_algorithm(name):
+    """Retrouve la description d'un algorithme dans ALGORITHMS à partir de son nom"""
+    return next(algo for algo in ALGORITHMS if algo['nom'] == name)
+
+def load_sweep_data(file_path):
+    """
+    Charge un fichier pour le balayage : ndarray (cache .npy) et liste Python
+    Retourne (tableau, liste, temps_chargement, temps_conversion_liste, cache_utilise)
+    """
+    start_time = time.perf_counter()
+    data_np, cache_used = load_data_array(file_path)
+    load_time = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    data = data_np.tolist()
+    list_time = time.perf_counter() - start_time
+    return data_np, data, load_time, list_time, cache_used
+
+def prefetch_file(file_path, chunk_size=1 << 20):
+    """
+    Lit le fichier de données (ou son cache .npy s'il est à jour) sans l'analyser, pour
+    l'amener dans le cache de pages du système : uniquement des lectures, qui relâchent le
+    GIL et ne concurrencent pas les mesures en cours dans le thread principal
+    """
+    cache_path, meta_path = _cache_paths(file_path)
+    try:
+        stat = os.stat(file_path)
+        signature = {'taille': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        fresh_cache = _read_cached_array(cache_path, meta_path, signature) is not None
+        buffer = bytearray(chunk_size)
+        with open(cache_path if fresh_cache else file_path, 'rb', buffering=0) as f:
+            while f.readinto(buffer):
+                pass
+    except OSError:
+        pass  # le chargement dans le thread principal signalera l'erreur
+
+# Dernier fichier chargé par un processus du pool (réutilisé par les tâches suivantes)
+_job_data_cache = {}
+
+def _job_data(file_path):
+    """Données d'une tâche exécutée dans un processus du pool"""
+    if file_path not in _job_data_cache:
+        _job_data_cache.clear()
+        data_np, data, _, _, _ = load_sweep_data(file_path)
+        _job_data_cache[file_path] = (data_np, data)
+    return _job_data_cache[file_path]
+
+def run_job(job, data=None):
+    """
+    Exécute une tâche du balayage et retourne sa mesure
+    data = (tableau, liste) si les données sont déjà chargées, sinon elles sont lues depuis le cache
+    """
+    algo = _find_algorithm(job['algorithme'])
+    if algo['donnees'] == 'fichier':
+        # Les algorithmes en flux lisent eux-mêmes le fichier
+        nums = job['fichier']
+    else:
+        data_np, data_list = data if data is not None else _job_data(job['fichier'])
+        nums = data_list if algo['donnees'] == 'liste' else data_np
+    record = {'algorithme': job['algorithme'], 'taille_donnees': job['taille_donnees'],
+              'repetition': job['repetition'], 'hash_fichier': job['hash_fichier'],
+              'version_code': job['version_code'], 'estime': False,
+              'date': datetime.now().isoformat(timespec='seconds')}
+    if algo['nom'] == 'brute_parallele':
+        # Au-delà du budget de temps, la mesure est remplacée par une estimation (voir main).
+        # Les processus sont démarrés une fois pour la tâche, hors des mesures
+        with BruteForcePool(np.asarray(nums, dtype=np.int64)) as pool:
+            try:
+                record.update(run_benchmark(
+                    lambda values, t: two_sum_brute_force_parallel(values, t, time_budget=job['budget'], pool=pool),
+                    pool.values, job['cible'], max_time=job['max_time']))
+            except TimeoutError:
+                record['estime'] = True
+    else:
+        record.update(run_benchmark(algo['fonction'], nums, job['cible'], max_time=job['max_time']))
+    return record
+
+def _init_sweep_worker(cpu_queue):
+    """Épingle chaque processus du pool sur son propre coeur pour ne pas fausser les mesures"""
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {cpu_queue.get()})
+
+def _brute_force_reference(records, data_size):
+    """Plus grande mesure réelle de la force brute parallèle en dessous de data_size : (taille, temps)"""
+    measured = [(r['taille_donnees'], r['mediane']) for r in records
+                if r['algorithme'] == 'brute_parallele' and not r['estime']
+                and r.get('mediane') is not None and r['taille_donnees'] < data_size]
+    return max(measured) if measured else (None, None)
+
+def _over_budget(job, records):
+    """Vrai si une mesure plus petite prédit que la force brute parallèle dépassera son budget"""
+    if job['algorithme'] != 'brute_parallele':
+        return False
+    predicted_time = estimate_brute_force_time(job['taille_donnees'], *_brute_force_reference(records, job['taille_donnees']))
+    return predicted_time is not None and predicted_time > job['budget']
+
+def _skipped_record(job):
+    """Mesure d'une tâche non exécutée (budget de temps dépassé), estimée ensuite"""
+    return {'algorithme': job['algorithme'], 'taille_donnees': job['taille_donnees'],
+            'repetition': job['repetition'], 'estime': True}
+
+def run_sweep(files, jobs, workers=1, quiet=False, on_record=None, known_records=()):
+    """
+    Exécute les tâches du balayage et retourne (mesures, chargements)
+    on_record est appelé avec chaque mesure dès qu'elle est terminée ;
+    known_records (mesures déjà stockées) servent aux estimations de budget
+
+    - workers > 1 : les tâches sont réparties sur un pool de processus, chacun
+      épinglé sur un coeur, avec au plus `workers` tâches en cours
+    - quiet (mode "machine calme") : les tâches sont chronométrées une par une
+      dans le processus principal, pendant qu'un thread lit le fichier suivant sans
+      l'analyser (E/S seulement) ; l'analyse et la conversion en liste ont lieu dans
+      le thread principal, entre les tâches
+    - sinon : exécution séquentielle, comme auparavant
+    """
+    records = []
+    loads = []
+    jobs_by_file = {}
+    for job in jobs:
+        jobs_by_file.setdefault(job['fichier'], []).append(job)
+    # Seuls les fichiers utilisés par un algorithme en mémoire sont chargés
+    in_memory_files = {job['fichier'] for job in jobs
+                       if _find_algorithm(job['algorithme'])['donnees'] != 'fichier'}
+
+    def load(file_path):
+        return load_sweep_data(file_path) if file_path in in_memory_files else None
+
+    def add_load_record(file_path, data_size, load_time, list_time, cache_used):
+        print(f"  {os.path.basename(file_path)}: chargement {load_time:.3e} s "
+              f"({'cache .npy' if cache_used else 'analyse du CSV'}), conversion en liste: {list_time:.3e} s")
+        loads.append({'algorithme': 'chargement', 'taille_donnees': data_size, 'estime': False,
+                      'mediane': load_time, 'repetitions': 1, 'cache_utilise': cache_used,
+                      'conversion_liste': list_time})
+
+    if workers > 1 and not quiet:
+        # Préparer les caches .npy une fois, puis les processus les ouvrent en mémoire mappée
+        for file_path, data_size in files:
+            if file_path in in_memory_files:
+                _, _, load_time, list_time, cache_used = load_sweep_data(file_path)
+                add_load_record(file_path, data_size, load_time, list_time, cache_used)
+
+        cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else []
+        workers = min(workers, len(cpus)) if cpus else workers
+        cpu_queue = multiprocessing.Queue()
+        for cpu in cpus[:workers]:
+            cpu_queue.put(cpu)
+        initializer = _init_sweep_worker if cpus else None
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                                 initargs=(cpu_queue,) if cpus else ()) as executor:
+            queue = list(jobs)
+            running = set()
+            while queue or running:
+                # Soumettre dans l'ordre des tailles, sans dépasser le nombre de processus
+                while queue and len(running) < workers:
+                    job = queue.pop(0)
+                    if _over_budget(job, [*known_records, *records]):
+                        records.append(_skipped_record(job))
+                        continue
+                    running.add(executor.submit(run_job, job))
+                if running:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record = future.result()
+                        if on_record:
+                            on_record(record)
+                        print(f"  Terminé: {record['algorithme']} (taille {record['taille_donnees']}, "
+                              f"répétition {record['repetition']})")
+                        records.append(record)
+        return records, loads
+
+    loader = ThreadPoolExecutor(max_workers=1) if quiet else None
+    try:
+        def prefetch(file_path):
+            return loader.submit(prefetch_file, file_path) if file_path in in_memory_files else None
+
+        next_read = prefetch(files[0][0]) if loader and files else None
+        for index, (file_path, data_size) in enumerate(files):
+            print(f"Traitement du fichier {os.path.basename(file_path)} (taille: {data_size})...")
+            if loader:
+                if next_read is not None:
+                    next_read.result()
+                # Analyse hors mesures, puis lecture du fichier suivant pendant les mesures
+                loaded = load(file_path)
+                next_read = prefetch(files[index + 1][0]) if index + 1 < len(files) else None
+            else:
+                loaded = load(file_path)
+            data_np = data = None
+            if loaded is not None:
+                data_np, data, load_time, list_time, cache_used = loaded
+                add_load_record(file_path, data_size, load_time, list_time, cache_used)
+                if len(data_np) == 0:
+                    print(f"Données vides pour {os.path.basename(file_path)}, on passe au fichier suivant")
+                    continue
+            for job in jobs_by_file.get(file_path, []):
+                if _over_budget(job, [*known_records, *records]):
+                    records.append(_skipped_record(job))
+                    continue
+                print(f"  Mesure du temps pour {_find_algorithm(job['algorithme'])['label']} "
+                      f"(répétition {job['repetition']})...")
+                record = run_job(job, (data_np, data))
+                if on_record:
+                    on_record(record)
+                records.append(record)
+    finally:
+        if loader:
+            loader.shutdown()
+    return records, loads
+
+def analyze_scaling(records, min_size=1000):
+    """
+    Ajuste l'exposant de complexité de chaque algorithme sur ses temps médians mesurés
+    (estimations exclues). Les tailles < min_size, dominées par les coûts fixes,
+    ne sont écartées que s'il reste au moins 3 points
+    """
+    fits = {}
+    for algo in ALGORITHMS:
+        measured = {}
+        for record in records:
+            if record['algorithme'] == algo['nom'] and not record['estime'] and record.get('mediane'):
+                measured.setdefault(record['taille_donnees'], []).append(record['mediane'])
+        points = sorted((size, float(np.median(times))) for size, times in measured.items())
+        if len([size for size, _ in points if size >= min_size]) >= 3:
+            points = [(size, t) for size, t in points if size >= min_size]
+        fits[algo['nom']] = fit_scaling(*zip(*points)) if len(points) >= 3 else None
+    return fits
+
+def write_scaling_report(fits, report_path, baseline_path, save_baseline=False,
+                         exponent_threshold=0.1, constant_threshold=0.25):
+    """
+    Écrit le rapport d'ajustement (JSON) et le compare à la référence si elle existe
+    Retourne la liste des régressions détectées
+    """
+    regressions = []
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = detect_regressions(fits, baseline['ajustements'], exponent_threshold, constant_threshold)
+    report = {'environnement': environment_metadata(), 'ajustements': fits,
+              'reference': baseline_path if os.path.exists(baseline_path) else None,
+              'seuils': {'exposant': exponent_threshold, 'constante': constant_threshold},
+              'regressions': regressions}
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Analyse de complexité sauvegardée dans '{report_path}'")
+    if save_baseline:
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Référence enregistrée dans '{baseline_path}'")
+    return regressions
+
+def parse_args(argv=None):
+    """Options de la ligne de commande du banc d'essai"""
+    parser = argparse.ArgumentParser(description="Comparaison des algorithmes Two Sum sur GreenIT_data")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="nombre de processus pour répartir les tâches (taille, algorithme, répétition)")
+    parser.add_argument('--repetitions', type=int, default=1,
+                        help="nombre de mesures indépendantes par couple (taille, algorithme)")
+    parser.add_argument('--calme', action='store_true',
+                        help="mode machine calme : mesures une par une, lecture du fichier suivant en parallèle")
+    parser.add_argument('--requetes', type=int, default=10000,
+                        help="taille des lots de cibles pour l'index multi-cibles (0 pour ne pas le mesurer)")
+    parser.add_argument('--max-memoire', type=int, default=10_000_000,
+                        help="au-delà de cette taille, seuls les algorithmes en flux sont mesurés")
+    parser.add_argument('--reference', default='comparaison_algos_reference.json',
+                        help="fichier d'ajustements de référence pour la détection de régressions")
+    parser.add_argument('--enregistrer-reference', action='store_true',
+                        help="enregistrer les ajustements de cette exécution comme nouvelle référence")
+    parser.add_argument('--recalculer', action='store_true',
+                        help="ignorer les mesures déjà présentes dans le stockage et tout remesurer")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+
     # Récupérer tous les fichiers CSV dans le dossier
     csv_files = [f for f in os.listdir(DATA_DIR) if f.endswith('.csv') and f.startswith('data_list_')]
     
     # Trier les fichiers par taille
     csv_files.sort(key=extract_number)
-    
-    # Stocker les résultats
-    results = {
-        'taille_donnees': [],
-        'temps_brute': [],
-        'temps_tri_pointeurs': [],
-        'temps_hachage': []
-    }
+    files = [(os.path.join(DATA_DIR, f), extract_number(f)) for f in csv_files]
     
     print("Analyse des performances des algorithmes Two Sum...")
     
-    # Variables pour l'estimation de la force brute
-    max_brute_force_size = 10000  # Taille maximale pour la force brute réelle (réduite pour montrer la différence)
-    reference_size = None
-    reference_time = None
-    
-    # Pour chaque fichier
-    for file in csv_files:
-        file_path = os.path.join(DATA_DIR, file)
-        data_size = extract_number(file)
-        
-        # Charger les données
-        print(f"Traitement du fichier {file} (taille: {data_size})...")
-        data = load_data(file_path)
-        
-        if not data:
-            print(f"Données vides pour {file}, on passe au fichier suivant")
-            continue
-            
-        # Définir une cible qui n'existe pas pour forcer le pire cas
-        # On utilise une valeur qui n'est probablement pas dans le tableau
-        target = -999999
-        
-        # Mesurer ou estimer le temps pour la force brute
-        if data_size <= max_brute_force_size:
-            print("  Mesure du temps pour la force brute...")
-            brute_time = measure_execution_time(two_sum_brute_force, data, target)
-            
-            # Stocker la référence pour l'estimation future
-            if reference_size is None or data_size > reference_size:
-                reference_size = data_size
-                reference_time = brute_time
+    # Paramètres du banc d'essai
+    max_time_per_measure = 10  # Durée maximale (secondes) consacrée à une mesure répétée
+    brute_force_time_budget = 120  # Budget (secondes) par exécution de la force brute parallèle
+    # Définir une cible qui n'existe pas pour forcer le pire cas
+    # On utilise une valeur qui n'est probablement pas dans le tableau
+    target = -999999
+
+    # Les mesures sont identifiées par le contenu du fichier et la version du code de l'algorithme :
+    # seules les cellules nouvelles ou dont le code a changé sont remesurées
+    file_hashes = {file_path: file_hash(file_path) for file_path, _ in files}
+    versions = {algo['nom']: code_version(algo['fonction']) for algo in ALGORITHMS}
+    store = {} if args.recalculer else load_store(STORE_PATH)
+
+    # Construire les tâches dans l'ordre (taille, algorithme, répétition)
+    jobs = []
+    stored_records = []
+    for file_path, data_size in files:
+        for algo in ALGORITHMS:
+            if algo['taille_max'] is not None and data_size > algo['taille_max']:
+                continue
+            # Fichiers trop gros pour la mémoire : uniquement le mode flux
+            if data_size > args.max_memoire and algo['donnees'] != 'fichier':
+                continue
+            for repetition in range(args.repetitions):
+                job = {'fichier': file_path, 'taille_donnees': data_size, 'algorithme': algo['nom'],
+                       'repetition': repetition, 'hash_fichier': file_hashes[file_path],
+                       'version_code': versions[algo['nom']], 'cible': target,
+                       'max_time': max_time_per_measure, 'budget': brute_force_time_budget}
+                if store_key(job) in store:
+                    stored_records.append(store[store_key(job)])
+                else:
+                    jobs.append(job)
+    print(f"{len(stored_records)} mesures reprises de '{STORE_PATH}', {len(jobs)} tâches à exécuter")
+
+    # Chaque mesure est ajoutée au stockage dès qu'elle est terminée (reprise après un arrêt)
+    files_to_run = [(file_path, data_size) for file_path, data_size in files
+                    if any(job['fichier'] == file_path for job in jobs)]
+    records, loads = run_sweep(files_to_run, jobs, workers=args.workers, quiet=args.calme,
+                               on_record=lambda record: append_to_store(STORE_PATH, record),
+                               known_records=stored_records)
+    records += stored_records
+
+    # Remettre les mesures dans l'ordre du tableau : taille, algorithme, répétition
+    algo_order = {algo['nom']: k for k, algo in enumerate(ALGORITHMS)}
+    records.sort(key=lambda r: (r['taille_donnees'], algo_order[r['algorithme']], r['repetition']))
+
+    # Estimer les mesures de la force brute parallèle qui ont dépassé le budget de temps
+    for record in records:
+        if record['estime']:
+            reference_size, reference_time = _brute_force_reference(records, record['taille_donnees'])
+            record['mediane'] = estimate_brute_force_time(record['taille_donnees'], reference_size, reference_time)
+            print(f"  Budget de {brute_force_time_budget} s dépassé pour la taille {record['taille_donnees']}, "
+                  f"temps estimé: {record['mediane']} secondes "
+                  f"(basé sur la référence: {reference_size} éléments en {reference_time} secondes)")
+
+    print("\nRésultats par taille:")
+    for record in records:
+        if record['estime']:
+            print(f"    {record['taille_donnees']} {record['algorithme']}: {record['mediane']} secondes (estimé)")
         else:
-            print(f"  Estimation du temps pour la force brute (taille {data_size} > {max_brute_force_size})...")
-            brute_time = estimate_brute_force_time(data_size, reference_size, reference_time)
-            print(f"  Temps estimé: {brute_time} secondes (basé sur la référence: {reference_size} éléments en {reference_time} secondes)")
-        
-        print("  Mesure du temps pour tri + pointeurs...")
-        sorting_time = measure_execution_time(two_sum_sorting, data, target)
-        
-        print("  Mesure du temps pour la table de hachage...")
-        hash_time = measure_execution_time(two_sum_hash_table, data, target)
-        
-        # Stocker les résultats
-        results['taille_donnees'].append(data_size)
-        results['temps_brute'].append(brute_time)
-        results['temps_tri_pointeurs'].append(sorting_time)
-        results['temps_hachage'].append(hash_time)
-        
-        print(f"  Résultats pour {file}:")
-        print(f"    Force brute: {brute_time} secondes {'(estimé)' if data_size > max_brute_force_size else ''}")
-        print(f"    Tri + pointeurs: {sorting_time} secondes")
-        print(f"    Table de hachage: {hash_time} secondes")
-        print()
+            print(f"    {record['taille_donnees']} {record['algorithme']}: médiane {record['mediane']:.3e} s, "
+                  f"IQR {record['iqr']:.1e} s, min {record['min']:.3e} s, "
+                  f"{record['repetitions']} répétitions, pic mémoire {record['memoire_pic_octets']} octets")
+
+    # Exposant de complexité empirique de chaque algorithme, comparé à la référence
+    print("\nAjustement temps = constante x n^exposant:")
+    fits = analyze_scaling(records)
+    for name, fit in fits.items():
+        if fit is not None:
+            print(f"    {name}: exposant {fit['exposant']:.3f} "
+                  f"[{fit['exposant_ic95'][0]:.3f}, {fit['exposant_ic95'][1]:.3f}], "
+                  f"constante {fit['constante']:.3e}, R² {fit['r2']:.3f} ({fit['points']} points)")
+    regressions = write_scaling_report(fits, 'comparaison_algos_analyse.json', args.reference,
+                                       save_baseline=args.enregistrer_reference)
+    for regression in regressions:
+        print(f"    RÉGRESSION {regression['algorithme']}: {', '.join(regression['raisons'])}")
+
+    # Index multi-cibles : débit de requêtes en fonction de la taille des données
+    index_records = []
+    if args.requetes > 0:
+        print("\nMesure de l'index multi-cibles...")
+        index_records = benchmark_index([(file_path, data_size) for file_path, data_size in files
+                                         if data_size <= args.max_memoire],
+                                        args.requetes, max_time=max_time_per_measure)
+    records = loads + records + index_records
     
     # Créer un DataFrame avec les résultats
-    results_df = pd.DataFrame(results)
+    results_df = pd.DataFrame(records)
     
     # Afficher le tableau des résultats
     print("\nRésultats complets:")
-    print(results_df)
+    if not results_df.empty:
+        print(results_df.pivot_table(index='taille_donnees', columns='algorithme', values='mediane', aggfunc='median'))
     
-    # Sauvegarder les résultats dans un CSV
+    # Sauvegarder les résultats (JSON avec métadonnées d'environnement + CSV)
+    try:
+        save_results_json(records, 'resultats_two_sum.json', environment_metadata())
+        print("Résultats et environnement sauvegardés dans 'resultats_two_sum.json'")
+    except Exception as e:
+        print(f"Erreur lors de la sauvegarde des résultats JSON: {e}")
     try:
-        results_df.to_csv('resultats_two_sum.csv', index=False)
+        save_results_csv(records, 'resultats_two_sum.csv')
         print("Résultats sauvegardés dans 'resultats_two_sum.csv'")
-    except PermissionError:
-        print("Erreur de permission: Impossible d'écrire le fichier resultats_two_sum.csv")
-        print("Essai avec un autre nom de fichier...")
-        try:
-            results_df.to_csv('resultats_two_sum_new.csv', index=False)
-            print("Résultats sauvegardés dans 'resultats_two_sum_new.csv'")
-        except Exception as e:
-            print(f"Erreur lors de la sauvegarde des résultats: {e}")
+    except Exception as e:
+        # Les mesures restent dans le stockage : relancer le script régénère le CSV sans rien remesurer
+        print(f"Erreur lors de la sauvegarde de 'resultats_two_sum.csv': {e}")
+        print(f"Les mesures sont conservées dans '{STORE_PATH}'")
     
     # Tracer le graphique seulement s'il y a des données
-    if len(results['taille_donnees']) > 0:
+    if not results_df.empty:
         plt.figure(figsize=(12, 8))
         
-        # Tracer tous les résultats, y compris les estimations pour la force brute
-        plt.plot(results['taille_donnees'], results['temps_brute'], 'o-', color='red', label='Force brute O(n²)')
-        plt.plot(results['taille_donnees'], results['temps_tri_pointeurs'], 'o-', color='blue', label='Tri + pointeurs O(n log n)')
-        plt.plot(results['taille_donnees'], results['temps_hachage'], 'o-', color='green', label='Table de hachage O(n)')
+        # Tracer la médiane de chaque algorithme, entourée de son intervalle interquartile
+        for algo in ALGORITHMS:
+            algo_df = results_df[results_df['algorithme'] == algo['nom']]
+            if algo_df.empty:
+                continue
+            # Une seule valeur par taille : médiane des répétitions indépendantes
+            algo_df = algo_df.groupby('taille_donnees', as_index=False).agg(
+                {col: 'median' for col in ('mediane', 'q1', 'q3') if col in algo_df} | {'estime': 'any'})
+            label = algo['label']
+            if fits.get(algo['nom']) is not None:
+                label += f" - mesuré n^{fits[algo['nom']]['exposant']:.2f}"
+            plt.plot(algo_df['taille_donnees'], algo_df['mediane'], algo['style'], color=algo['couleur'], label=label)
+            measured_df = algo_df[~algo_df['estime']]
+            if 'q1' in measured_df:
+                plt.fill_between(measured_df['taille_donnees'], measured_df['q1'], measured_df['q3'],
+                                 color=algo['couleur'], alpha=0.2)
         
         plt.xlabel('Taille des données')
-        plt.ylabel('Temps d\'exécution (secondes)')
+        plt.ylabel('Temps d\'exécution médian (secondes)')
         plt.title('Comparaison des algorithmes pour le problème Two Sum')
         plt.legend()
         plt.grid(True)
         plt.xscale('log')  # Échelle logarithmique pour mieux visualiser
         plt.yscale('log')  # Échelle logarithmique pour mieux visualiser
         
-        # Ajouter une annotation pour indiquer les valeurs estimées
-        plt.axvline(x=max_brute_force_size, color='gray', linestyle='--')
-        plt.text(max_brute_force_size*1.1, plt.ylim()[0]*2, 
-                 f'Valeurs estimées\npour la force brute\nau-delà de {max_brute_force_size}',
-                 color='gray')
+        # Entourer les valeurs estimées (budget de temps dépassé) de la force brute parallèle
+        estimated_df = results_df[results_df['estime'] & results_df['mediane'].notna()]
+        if not estimated_df.empty:
+            plt.scatter(estimated_df['taille_donnees'], estimated_df['mediane'], s=150, facecolors='none', edgecolors='gray',
+                        label=f'Valeurs estimées (budget de {brute_force_time_budget} s dépassé)')
+            plt.legend()
         
         # Sauvegarder le graphique
         try:
@@ -213,6 +1061,24 @@ def main():
         except Exception as e:
             print(f"Erreur lors de la sauvegarde du graphique: {e}")
         
+        # Courbe du débit de l'index multi-cibles (requêtes par seconde en fonction de n)
+        if index_records:
+            plt.figure(figsize=(12, 8))
+            plt.plot([r['taille_donnees'] for r in index_records], [r['requetes_par_seconde'] for r in index_records],
+                     'o-', color='teal', label=f'Index multi-cibles (lots de {args.requetes} cibles)')
+            plt.xlabel('Taille des données')
+            plt.ylabel('Requêtes par seconde')
+            plt.title('Débit de l\'index Two Sum multi-cibles')
+            plt.legend()
+            plt.grid(True)
+            plt.xscale('log')
+            plt.yscale('log')
+            try:
+                plt.savefig('debit_index_two_sum.png', dpi=300, bbox_inches='tight')
+                print("Graphique sauvegardé dans 'debit_index_two_sum.png'")
+            except Exception as e:
+                print(f"Erreur lors de la sauvegarde du graphique: {e}")
+
         # Afficher le graphique
         try:
             plt.show()
@@ -220,4 +1086,4 @@ def main():
             print(f"Erreur lors de l'affichage du graphique: {e}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()